@@ -13,7 +13,7 @@ try:
 except ImportError as e:
     print(f"❌ Import Error: {e}")
     print("Make sure you're running from the correct directory and have installed all dependencies:")
-    print("pip install fastapi uvicorn pydantic python-multipart requests typer rich")
+    print("pip install -r requirements.txt")
     sys.exit(1)
 
 def main():
@@ -36,8 +36,10 @@ def main():
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
     reload = os.getenv("RELOAD", "true").lower() == "true"
+    # Auto-reload only supports a single worker process
+    workers = 1 if reload else int(os.getenv("WORKERS", os.cpu_count() or 1))
     
-    print(f"🌐 Starting server on http://{host}:{port}")
+    print(f"🌐 Starting server on http://{host}:{port} ({workers} worker{'s' if workers > 1 else ''})")
     print(f"📚 API docs will be available at http://localhost:{port}/docs")
     print(f"🏥 Health check at http://localhost:{port}/api/v1/health")
     print("=" * 50)
@@ -48,6 +50,10 @@ def main():
             host=host,
             port=port,
             reload=reload,
+            workers=workers,
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
+            access_log=False,  # Requests are logged by ObservabilityMiddleware
             log_level="info"
         )
     except KeyboardInterrupt:
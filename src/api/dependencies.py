@@ -1,55 +1,139 @@
 from fastapi import HTTPException, Header, Depends
-from typing import Optional
+from typing import Optional, Dict, Tuple
+from functools import lru_cache
 import os
-import requests
+import re
+import threading
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
 from src.github_client import GitHubClient
 from src.repo_analyzer import RepositoryAnalyzer  
 from src.database import RepositoryDatabase
 from src.config import GITHUB_TOKEN
 
+# /rate_limit is polled on every health check; reuse the last answer for a few seconds
+_RATE_LIMIT_CACHE = TTLCache(maxsize=1, ttl=10)
+
+# GitHub owner/repo names: letters, digits, '.', '_', '-' (but never "." or "..")
+_REPO_PART_RE = re.compile(r"(?!\.\.?$)[A-Za-z0-9._-]{1,100}")
+
+# User IDs end up in table names; anything else is rejected before it reaches the database
+_USER_ID_RE = re.compile(r"[A-Za-z0-9_]{1,64}")
+
+# ETag store for conditional GitHub requests (304s don't count against quota)
+_etag_cache: Dict[str, Tuple[str, dict]] = {}
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    """Dependency to get the shared async HTTP client for GitHub calls"""
+    return httpx.AsyncClient(timeout=5.0, headers={"Authorization": f"Bearer {GITHUB_TOKEN}"})
+
+async def close_http_client():
+    """Close the shared HTTP client (called on API shutdown)"""
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
+
+@lru_cache(maxsize=1)
+def _github_client() -> GitHubClient:
+    return GitHubClient()
+
+@lru_cache(maxsize=1)
+def _repository_analyzer() -> RepositoryAnalyzer:
+    return RepositoryAnalyzer()
+
+class _DatabaseCache(LRUCache):
+    """LRU of per-user databases that closes each evicted instance's connection"""
+    
+    def popitem(self):
+        user_id, db = super().popitem()
+        db.close()
+        return user_id, db
+
+_databases = _DatabaseCache(maxsize=256)
+_databases_lock = threading.Lock()
+
+def _db_for(user_id: Optional[str]) -> RepositoryDatabase:
+    """Reuse one database handle per user instead of re-initializing it per request"""
+    if user_id is not None and not _USER_ID_RE.fullmatch(user_id):
+        raise HTTPException(status_code=400, detail="Invalid user ID. Use 1-64 letters, digits or underscores.")
+    
+    with _databases_lock:
+        db = _databases.get(user_id)
+        if db is None:
+            db = _databases[user_id] = RepositoryDatabase(user_id=user_id)
+        return db
+
+def close_databases():
+    """Close every cached database (called on API shutdown)"""
+    with _databases_lock:
+        while _databases:
+            _databases.popitem()
+
 async def get_github_client() -> GitHubClient:
     """Dependency to get GitHub client"""
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="GitHub token not configured")
-    return GitHubClient()
+    return _github_client()
 
 async def get_repository_analyzer() -> RepositoryAnalyzer:
     """Dependency to get repository analyzer with full comprehensive functionality"""
-    return RepositoryAnalyzer()
+    return _repository_analyzer()
 
 async def get_database(user_id: Optional[str] = None) -> RepositoryDatabase:
     """Dependency to get user-specific database"""
-    return RepositoryDatabase(user_id=user_id)
+    return _db_for(user_id)
 
 async def get_user_id(x_user_id: Optional[str] = Header(None)) -> str:
     """Extract user ID from header or generate default"""
-    return x_user_id or f"api_user_{os.getenv('USER', 'unknown')}"
+    return x_user_id or re.sub(r"[^A-Za-z0-9_]", "_", f"api_user_{os.getenv('USER', 'unknown')}")[:64]
 
-async def validate_repo_format(owner: str, repo: str):
-    """Validate repository owner/name format"""
-    if not owner or not repo or '/' in owner or '/' in repo:
+def validate_repo_format(owner: str, repo: str) -> bool:
+    """Validate repository owner/name format (called directly, not as a dependency)"""
+    if not (_REPO_PART_RE.fullmatch(owner) and _REPO_PART_RE.fullmatch(repo)):
         raise HTTPException(
             status_code=400, 
             detail="Invalid repository format. Use owner and repo as separate path parameters."
         )
     return True
 
+async def fetch_github_json(url: str) -> Tuple[int, Optional[dict]]:
+    """GET a GitHub REST resource, revalidating the last response with its ETag"""
+    etag, cached = _etag_cache.get(url, (None, None))
+    headers = {"If-None-Match": etag} if etag else None
+    
+    response = await get_http_client().get(url, headers=headers)
+    
+    if response.status_code == 304 and cached is not None:
+        return 200, cached
+    
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    data = orjson.loads(response.content)
+    if response.headers.get("ETag"):
+        _etag_cache[url] = (response.headers["ETag"], data)
+    return 200, data
+
 async def check_github_api_health() -> dict:
     """Check GitHub API connectivity and rate limits"""
     try:
-        headers = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
-        response = requests.get("https://api.github.com/rate_limit", headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            rate_data = response.json()
-            remaining = rate_data.get('rate', {}).get('remaining', 0)
+        rate_data = _RATE_LIMIT_CACHE.get("rate_limit")
+        if rate_data is None:
+            status_code, rate_data = await fetch_github_json("https://api.github.com/rate_limit")
+            
+            if status_code != 200:
+                return {"status": "error", "message": f"HTTP {status_code}"}
             
-            if remaining < 100:
-                return {"status": "limited", "remaining": remaining}
-            else:
-                return {"status": "ok", "remaining": remaining}
+            _RATE_LIMIT_CACHE["rate_limit"] = rate_data
+        
+        remaining = rate_data.get('rate', {}).get('remaining', 0)
+        
+        if remaining < 100:
+            return {"status": "limited", "remaining": remaining}
         else:
-            return {"status": "error", "message": f"HTTP {response.status_code}"}
+            return {"status": "ok", "remaining": remaining}
             
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -57,7 +141,7 @@ async def check_github_api_health() -> dict:
 async def check_database_health(user_id: str = "health_check") -> dict:
     """Check database connectivity"""
     try:
-        db = RepositoryDatabase(user_id=user_id)
+        db = _db_for(user_id)
         stats = db.get_statistics()
         return {"status": "ok", "stats": stats}
     except Exception as e:
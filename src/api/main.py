@@ -1,12 +1,14 @@
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-import time
 import logging
+import orjson
 from src import __version__
 from .routes import router
+from .middleware import ObservabilityMiddleware, PingMiddleware, StaticCORSMiddleware
+from .dependencies import get_http_client, close_http_client, close_databases
+from .responses import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,6 +33,7 @@ app = FastAPI(
     Pass your user ID in the `X-User-ID` header to maintain personal repository history.
     """,
     version=__version__,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_tags=[
@@ -41,101 +44,81 @@ app = FastAPI(
     ]
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
-)
+# Add CORS middleware (allows any origin; configure this properly for production)
+app.add_middleware(StaticCORSMiddleware)
 
-# Add request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add processing time to response headers"""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(round(process_time, 4))
-    return response
-
-# Add request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests"""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"Request: {request.method} {request.url}")
-    
-    response = await call_next(request)
-    
-    # Log response
-    process_time = time.time() - start_time
-    logger.info(f"Response: {response.status_code} - {process_time:.4f}s")
-    
-    return response
+# Add request timing and logging middleware (pure ASGI)
+app.add_middleware(ObservabilityMiddleware)
+
+# Health check for load balancers/monitoring; outermost so probes skip everything else
+app.add_middleware(PingMiddleware)
 
 # Include API routes
 app.include_router(router)
 
+# Static payloads for / and /info, serialized once at import
+_ROOT_BYTES = orjson.dumps({
+    "message": "GitHub Repository Selector API",
+    "version": __version__,
+    "description": "API for discovering Python repositories suitable for SWE Challenge V3",
+    "endpoints": {
+        "documentation": "/docs",
+        "redoc": "/redoc",
+        "health": "/api/v1/health",
+        "search": "/api/v1/search",
+        "analyze": "/api/v1/analyze/{owner}/{repo}",
+        "stats": "/api/v1/users/{user_id}/stats",
+        "export": "/api/v1/export"
+    },
+    "features": [
+        "User-specific repository tracking",
+        "Comprehensive repository analysis",
+        "Fresh results filtering",
+        "Multiple export formats",
+        "GitHub rate limit awareness"
+    ]
+})
+
+_INFO_BYTES = orjson.dumps({
+    "api_name": "GitHub Repository Selector",
+    "version": __version__,
+    "purpose": "Discover Python repositories suitable for SWE Challenge V3 contributions",
+    "usage": {
+        "authentication": "Optional: Pass X-User-ID header for personalized tracking",
+        "rate_limits": "Respects GitHub API rate limits (5000 requests/hour)",
+        "user_tracking": "Each user gets personalized repository history"
+    },
+    "analysis_criteria": {
+        "activity_score": "Repository maintenance and recent activity (30%)",
+        "opportunity_score": "Available contribution opportunities (35%)",
+        "complexity_score": "Project manageability and size (20%)",
+        "maintainability_score": "Documentation and guidelines (15%)"
+    },
+    "supported_formats": ["json", "csv", "yaml", "markdown"],
+    "example_usage": {
+        "search": "POST /api/v1/search with min_stars, max_stars, limit",
+        "analyze": "GET /api/v1/analyze/owner/repository",
+        "stats": "GET /api/v1/users/your_username/stats"
+    }
+})
+
+_STATIC_HEADERS = {"Cache-Control": "public, max-age=600"}
+
 @app.get("/")
 async def root():
     """API root endpoint with basic information"""
-    return {
-        "message": "GitHub Repository Selector API",
-        "version": __version__,
-        "description": "API for discovering Python repositories suitable for SWE Challenge V3",
-        "endpoints": {
-            "documentation": "/docs",
-            "redoc": "/redoc",
-            "health": "/api/v1/health",
-            "search": "/api/v1/search",
-            "analyze": "/api/v1/analyze/{owner}/{repo}",
-            "stats": "/api/v1/users/{user_id}/stats",
-            "export": "/api/v1/export"
-        },
-        "features": [
-            "User-specific repository tracking",
-            "Comprehensive repository analysis",
-            "Fresh results filtering",
-            "Multiple export formats",
-            "GitHub rate limit awareness"
-        ]
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json", headers=_STATIC_HEADERS)
 
 @app.get("/info")
 async def api_info():
     """Detailed API information and usage guidelines"""
-    return {
-        "api_name": "GitHub Repository Selector",
-        "version": __version__,
-        "purpose": "Discover Python repositories suitable for SWE Challenge V3 contributions",
-        "usage": {
-            "authentication": "Optional: Pass X-User-ID header for personalized tracking",
-            "rate_limits": "Respects GitHub API rate limits (5000 requests/hour)",
-            "user_tracking": "Each user gets personalized repository history"
-        },
-        "analysis_criteria": {
-            "activity_score": "Repository maintenance and recent activity (30%)",
-            "opportunity_score": "Available contribution opportunities (35%)",
-            "complexity_score": "Project manageability and size (20%)",
-            "maintainability_score": "Documentation and guidelines (15%)"
-        },
-        "supported_formats": ["json", "csv", "yaml", "markdown"],
-        "example_usage": {
-            "search": "POST /api/v1/search with min_stars, max_stars, limit",
-            "analyze": "GET /api/v1/analyze/owner/repository",
-            "stats": "GET /api/v1/users/your_username/stats"
-        }
-    }
+    return Response(content=_INFO_BYTES, media_type="application/json", headers=_STATIC_HEADERS)
 
 # Custom exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle request validation errors with detailed messages"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation Error",
@@ -148,7 +131,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle HTTP exceptions with consistent format"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": "HTTP Error",
@@ -161,8 +144,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unhandled errors"""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -176,15 +159,12 @@ async def global_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     """Execute on API startup"""
     logger.info(f"GitHub Repository Selector API v{__version__} starting up...")
+    get_http_client()
     logger.info("API documentation available at /docs")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Execute on API shutdown"""
     logger.info("GitHub Repository Selector API shutting down...")
-
-# Health check for load balancers/monitoring
-@app.get("/ping")
-async def ping():
-    """Simple ping endpoint for load balancers"""
-    return {"status": "ok", "timestamp": time.time()}
+    await close_http_client()
+    close_databases()
@@ -0,0 +1,94 @@
+import time
+import random
+import logging
+from src.config import REQUEST_LOG_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+_PING_BODY = b'{"status":"ok"}'
+_PING_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_PING_BODY)).encode()),
+]
+
+# Wildcard origin without credentials: browsers reject "*" combined with allow-credentials
+_CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-methods", b"GET, POST, PUT, DELETE"),
+    (b"access-control-allow-headers", b"*"),
+]
+_CORS_PREFLIGHT_HEADERS = _CORS_HEADERS + [
+    (b"access-control-max-age", b"600"),
+    (b"content-length", b"0"),
+]
+
+def _is_preflight(headers) -> bool:
+    """Whether raw ASGI headers carry both Origin and Access-Control-Request-Method"""
+    names = {name for name, _ in headers}
+    return b"origin" in names and b"access-control-request-method" in names
+
+class StaticCORSMiddleware:
+    """Append precomputed CORS headers to every response and answer CORS preflights directly"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Only real CORS preflights are answered here; other OPTIONS requests reach the app
+        if scope["method"] == "OPTIONS" and _is_preflight(scope["headers"]):
+            await send({"type": "http.response.start", "status": 204, "headers": _CORS_PREFLIGHT_HEADERS})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + _CORS_HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+class PingMiddleware:
+    """Answer load balancer probes on /ping before routing, with a prebuilt response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/ping" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": _PING_HEADERS})
+        await send({"type": "http.response.body", "body": _PING_BODY})
+
+class ObservabilityMiddleware:
+    """Add X-Process-Time to responses and log requests (every 4xx/5xx, a sample of the rest)"""
+
+    def __init__(self, app, sample_rate: float = REQUEST_LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Integer nanoseconds from the monotonic clock; converted to seconds once per response
+        start_ns = time.perf_counter_ns()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                process_time = (time.perf_counter_ns() - start_ns) / 1e9
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-process-time", f"{process_time:.4f}".encode())
+                ]
+                status = message["status"]
+                if status >= 400 or random.random() < self.sample_rate:
+                    logger.info("%s %s - %d - %.4fs", scope["method"], scope["path"], status, process_time)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Dict
+from collections import Counter
 import asyncio
+import hashlib
 from datetime import datetime
+from cachetools import TTLCache
 
 from .models import *
 from .dependencies import *
-from src.github_client import GitHubClient
+from .dependencies import _db_for
+from src.github_client import GitHubClient, GraphQLError
 from src.repo_analyzer import RepositoryAnalyzer
 from src.database import RepositoryDatabase
 from src.dataBaseExporter import DatabaseExporter
@@ -13,6 +18,14 @@ from src import __version__
 
 router = APIRouter(prefix="/api/v1", tags=["repository-selector"])
 
+# Analysis results are reused for 15 minutes to spare the GitHub rate limit
+_ANALYSIS_CACHE = TTLCache(maxsize=2048, ttl=900)
+_ANALYSIS_LOCKS: Dict[str, asyncio.Lock] = {}
+
+# Health statuses are reused for as long as clients may cache them (Cache-Control max-age)
+_HEALTH_CACHE = TTLCache(maxsize=1, ttl=10)
+_ANALYSIS_LOCK_USERS: Counter = Counter()
+
 @router.post("/search", response_model=SearchResponse)
 async def search_repositories(
     request: SearchRequest,
@@ -27,7 +40,8 @@ async def search_repositories(
         if request.user_id:
             user_id = request.user_id
         
-        db = RepositoryDatabase(user_id=user_id)
+        # Opening a user's database and every query on it block on SQLite; keep them off the event loop
+        db = await run_in_threadpool(_db_for, user_id)
         
         # Search with multiple attempts for fresh results
         all_candidates = []
@@ -36,21 +50,35 @@ async def search_repositories(
         max_attempts = 3 if request.fresh_only and not request.force_refresh else 1
         rate_limit_remaining = 5000  # Default
         
-        for attempt in range(max_attempts):
+        def run_attempt(attempt: int) -> Dict:
             current_offset = search_offset + (attempt * request.limit)
             
             # Use enhanced search if available
             if hasattr(github_client, 'search_with_randomization'):
-                search_result = github_client.search_with_randomization(
+                return github_client.search_with_randomization(
                     request.min_stars, request.max_stars, request.limit, current_offset
                 )
-            else:
-                search_result = github_client.search_repositories_graphql(
-                    request.min_stars, request.max_stars, request.limit
-                )
+            return github_client.search_repositories_graphql(
+                request.min_stars, request.max_stars, request.limit
+            )
+        
+        # Attempts use different offsets and don't depend on each other, so run them concurrently
+        search_results = await asyncio.gather(
+            *(run_in_threadpool(run_attempt, attempt) for attempt in range(max_attempts)),
+            return_exceptions=True
+        )
+        
+        failures = [result for result in search_results if isinstance(result, Exception)]
+        if len(failures) == len(search_results):
+            raise failures[0]
+        
+        for search_result in search_results:
+            if isinstance(search_result, Exception):
+                continue
             
             repos = search_result['repositories']
-            rate_limit_remaining = search_result['rate_limit']['remaining']
+            if search_result['rate_limit']:
+                rate_limit_remaining = min(rate_limit_remaining, search_result['rate_limit']['remaining'])
             
             if not repos:
                 continue
@@ -64,36 +92,35 @@ async def search_repositories(
             
             # Apply freshness filtering
             if not request.force_refresh and request.fresh_only:
-                good_candidates = db.filter_new_repositories(good_candidates, request.days_filter)
+                good_candidates = await run_in_threadpool(
+                    db.filter_new_repositories, good_candidates, request.days_filter
+                )
             
             all_candidates.extend(good_candidates)
             
             if len(all_candidates) >= 3 or request.force_refresh:
                 break
         
-        # Remove duplicates
-        seen = set()
-        unique_candidates = []
+        # Remove duplicates (dict keeps first-seen order)
+        unique = {}
         for repo in all_candidates:
-            if repo['repo_name'] not in seen:
-                seen.add(repo['repo_name'])
-                repo['is_new'] = True
-                unique_candidates.append(repo)
+            unique.setdefault(repo['repo_name'], repo)
+        unique_candidates = list(unique.values())
         
         # Save to database
+        search_criteria = {
+            'min_stars': request.min_stars,
+            'max_stars': request.max_stars, 
+            'limit': request.limit
+        }
         if unique_candidates:
-            search_criteria = {
-                'min_stars': request.min_stars,
-                'max_stars': request.max_stars, 
-                'limit': request.limit
-            }
-            db.add_repositories(unique_candidates, search_criteria, search_offset)
+            await run_in_threadpool(db.add_repositories, unique_candidates, search_criteria, search_offset)
         
-        # Convert to response format
-        repositories = [Repository(**repo) for repo in unique_candidates]
+        # Convert to response format (analyzer output already matches the model, so skip validation)
+        repositories = [Repository.model_construct(**repo) for repo in unique_candidates]
         
         # Get database statistics
-        db_stats = db.get_statistics()
+        db_stats = await run_in_threadpool(db.get_statistics)
         
         return SearchResponse(
             success=True,
@@ -102,10 +129,12 @@ async def search_repositories(
             user_id=user_id,
             total_found=len(repositories),
             rate_limit_remaining=rate_limit_remaining,
-            search_criteria=request.dict(),
+            search_criteria=search_criteria,
             database_stats=db_stats
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
@@ -113,14 +142,50 @@ async def search_repositories(
 async def analyze_repository(
     owner: str,
     repo: str,
-    analyzer: RepositoryAnalyzer = Depends(get_repository_analyzer),
-    _: bool = Depends(validate_repo_format)
+    analyzer: RepositoryAnalyzer = Depends(get_repository_analyzer)
 ):
     """Analyze repository suitability for SWE Challenge V3 using comprehensive analysis"""
     
+    validate_repo_format(owner, repo)
+    
+    key = _analysis_cache_key(owner, repo)
+    cached = _ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
+    # Only one request per repository hits GitHub; concurrent callers wait for its result
+    lock = _ANALYSIS_LOCKS.setdefault(key, asyncio.Lock())
+    _ANALYSIS_LOCK_USERS[key] += 1
+    try:
+        async with lock:
+            cached = _ANALYSIS_CACHE.get(key)
+            if cached is not None:
+                return cached
+            
+            # The GitHub fetch blocks (retries, rate-limit waits), so run it off the event loop
+            response = await run_in_threadpool(_build_analysis_response, analyzer, owner, repo)
+            
+            # Don't pin transient GitHub failures in the cache
+            if not any(w.startswith('Analysis failed') for w in response.warnings):
+                _ANALYSIS_CACHE[key] = response
+            return response
+    finally:
+        # Drop the lock only once no caller is holding or waiting on it
+        _ANALYSIS_LOCK_USERS[key] -= 1
+        if not _ANALYSIS_LOCK_USERS[key]:
+            del _ANALYSIS_LOCK_USERS[key]
+            del _ANALYSIS_LOCKS[key]
+
+def _analysis_cache_key(owner: str, repo: str) -> str:
+    """Build the analysis cache key for a repository"""
+    return hashlib.sha256(f"{owner.lower()}/{repo.lower()}".encode()).hexdigest()
+
+def _build_analysis_response(analyzer: RepositoryAnalyzer, owner: str, repo: str) -> AnalysisResponse:
+    """Run the deep analysis and convert it to the API response format"""
+    
     try:
         # Use your comprehensive CLI analyzer instead of basic analysis
-        analysis = analyzer.analyze_repository_deep(owner, repo)
+        analysis = analyzer.analyze_repository_deep(owner, repo, raise_errors=True)
         
         if not analysis:
             raise HTTPException(status_code=404, detail=f"Repository {owner}/{repo} not found")
@@ -166,6 +231,10 @@ async def analyze_repository(
         
     except HTTPException:
         raise
+    except GraphQLError as e:
+        # Only NOT_FOUND means the repository is missing; that case never gets here
+        status_code = 429 if 'RATE_LIMITED' in e.types else 502
+        raise HTTPException(status_code=status_code, detail=f"Analysis failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
@@ -174,7 +243,7 @@ async def get_user_statistics(user_id: str):
     """Get user-specific repository statistics"""
     
     try:
-        db = RepositoryDatabase(user_id=user_id)
+        db = _db_for(user_id)
         stats = db.get_statistics()
         
         return UserStats(
@@ -185,6 +254,8 @@ async def get_user_statistics(user_id: str):
             total_searches=stats.get('total_searches', 0)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
@@ -200,28 +271,29 @@ async def export_database(
         if request.user_id:
             user_id = request.user_id
             
-        db = RepositoryDatabase(user_id=user_id)
+        db = _db_for(user_id)
         exporter = DatabaseExporter(db.db_path)
         
-        repositories = exporter.get_user_repositories(user_id)
+        # Reading and serializing a whole user database is blocking work; keep it off the event loop
+        repositories = await run_in_threadpool(
+            exporter.get_user_repositories, user_id, request.format != "csv"
+        )
         
         if not repositories:
             raise HTTPException(status_code=404, detail=f"No repositories found for user {user_id}")
         
         # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"repositories_{user_id}_{timestamp}.{request.format}"
+        now = datetime.now()
+        filename = f"repositories_{user_id}_{now:%Y%m%d_%H%M%S}.{request.format}"
         
         # Export based on format
-        success = False
-        if request.format == "json":
-            success = exporter.export_to_json(repositories, filename)
-        elif request.format == "csv":
-            success = exporter.export_to_csv(repositories, filename)
-        elif request.format == "yaml":
-            success = exporter.export_to_yaml(repositories, filename)
-        elif request.format == "markdown":
-            success = exporter.export_to_markdown(repositories, filename)
+        export_functions = {
+            "json": exporter.export_to_json,
+            "csv": exporter.export_to_csv,
+            "yaml": exporter.export_to_yaml,
+            "markdown": exporter.export_to_markdown
+        }
+        success = await run_in_threadpool(export_functions[request.format], repositories, filename)
         
         if not success:
             raise HTTPException(status_code=500, detail="Export failed")
@@ -233,33 +305,52 @@ async def export_database(
             export_info={
                 "format": request.format,
                 "total_repositories": len(repositories),
-                "exported_at": datetime.now().isoformat(),
+                "exported_at": now.isoformat(),
                 "filename": filename
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request, response: Response):
     """API health check with comprehensive status"""
     
     try:
-        # Check GitHub API
-        github_health = await check_github_api_health()
-        github_status = github_health.get('status', 'unknown')
-        
-        # Check database
-        db_health = await check_database_health()
-        db_status = db_health.get('status', 'unknown')
-        
-        # Determine overall status
-        overall_status = "healthy"
-        if github_status == "error" or db_status == "error":
-            overall_status = "unhealthy"
-        elif github_status == "limited":
-            overall_status = "degraded"
+        # Probe GitHub and the database only when the last snapshot has expired, so a
+        # conditional request against a fresh snapshot is answered without any upstream call
+        statuses = _HEALTH_CACHE.get("statuses")
+        if statuses is None:
+            # Check GitHub API
+            github_health = await check_github_api_health()
+            github_status = github_health.get('status', 'unknown')
+            
+            # Check database
+            db_health = await check_database_health()
+            db_status = db_health.get('status', 'unknown')
+            
+            # Determine overall status
+            overall_status = "healthy"
+            if github_status == "error" or db_status == "error":
+                overall_status = "unhealthy"
+            elif github_status == "limited":
+                overall_status = "degraded"
+            
+            statuses = _HEALTH_CACHE["statuses"] = (overall_status, github_status, db_status)
+        
+        overall_status, github_status, db_status = statuses
+        
+        # Let monitors revalidate cheaply: the ETag only changes when a status does
+        status_digest = hashlib.sha256(f"{overall_status}|{github_status}|{db_status}".encode()).hexdigest()
+        cache_headers = {"Cache-Control": "max-age=10", "ETag": f'W/"{status_digest[:16]}"'}
+        
+        if request.headers.get("if-none-match") == cache_headers["ETag"]:
+            return Response(status_code=304, headers=cache_headers)
+        
+        response.headers.update(cache_headers)
         
         return HealthResponse(
             status=overall_status,
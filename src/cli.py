@@ -1,33 +1,32 @@
+import re
+import atexit
 import typer
-import sys
-import os
 from typing import List, Dict
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-
-try:
-    from .config import MIN_STARS, MAX_STARS, DEFAULT_LIMIT, DEFAULT_EXPORT_CSV, MIN_PY_FILES, MAX_PY_FILES, ALLOWED_LICENSES, GITHUB_TOKEN
-    from .repo_analyzer import RepositoryAnalyzer
-    from .github_client import GitHubClient
-    from .database import RepositoryDatabase
-    from .dataBaseExporter import DatabaseExporter
-except ImportError:
-    from config import MIN_STARS, MAX_STARS, DEFAULT_LIMIT, DEFAULT_EXPORT_CSV, MIN_PY_FILES, MAX_PY_FILES, ALLOWED_LICENSES, GITHUB_TOKEN
-    from repo_analyzer import RepositoryAnalyzer
-    from github_client import GitHubClient
-    from database import RepositoryDatabase
-    from dataBaseExporter import DatabaseExporter
 
+from .config import MIN_STARS, MAX_STARS, DEFAULT_LIMIT, DEFAULT_EXPORT_CSV, MIN_PY_FILES, MAX_PY_FILES, ALLOWED_LICENSES, GITHUB_TOKEN, ALLOWED_LICENSES_NORMALIZED, LICENSE_CANONICAL, LICENSE_MAPPINGS_NORMALIZED, normalize_license
+from .database import RepositoryDatabase
 
 console = Console()
 
+# owner/repo, optionally as a github.com URL with a .git suffix, trailing slash, subpath, query or fragment
+_REPO_URL_RE = re.compile(r'^(?:https?://)?(?:www\.)?(?:github\.com/)?([A-Za-z0-9-]+)/([A-Za-z0-9_.-]+?)(?:\.git)?(?:[/?#].*)?$')
+
 # Create the app object that main.py expects
 app = typer.Typer(help="GitHub Repository Selector for SWE Challenge V3")
 
+@lru_cache(maxsize=1)
+def _get_db() -> RepositoryDatabase:
+    """Open the current user's database once and share it across commands"""
+    db = RepositoryDatabase()
+    # Closing runs PRAGMA optimize over the queries this command made
+    atexit.register(db.close)
+    return db
+
 def display_graphql_results(results: List[Dict], db_stats: Dict = None):
     """Display GraphQL results in a formatted way"""
     if not results:
@@ -40,23 +39,48 @@ def display_graphql_results(results: List[Dict], db_stats: Dict = None):
         user_info = f" (User: {db_stats.get('user_id', 'unknown')})" if 'user_id' in db_stats else ""
         console.print(f"📊 Database: {db_stats['total_repositories']} total repos tracked, {db_stats['recent_repositories']} shown recently{user_info}\n")
     
-    for i, repo in enumerate(results[:10], 1):
+    from rich.markup import escape
+    from rich.table import Table
+    
+    # One table rendered in a single print instead of several markup-parsed prints per repo
+    table = Table(show_lines=True)
+    table.add_column("#", justify="right")
+    table.add_column("New")
+    table.add_column("Repository", style="cyan")
+    table.add_column("Stars", justify="right", style="yellow")
+    table.add_column("License", style="green")
+    table.add_column("Python %", justify="right", style="blue")
+    table.add_column("URL")
+    
+    for i, repo in enumerate(islice(results, 10), 1):
         repo_name = repo.get('repo_name', repo.get('name', 'Unknown'))
         stars = repo.get('stars', repo.get('star_count', 0))
-        license_name = repo.get('license', 'Unknown')
-        python_pct = repo.get('python_percentage', '0%')
-        url = repo.get('url', '#')
         description = repo.get('description', '')
         
-        # Check if this is a new repo
-        is_new = "🆕" if repo.get('is_new', True) else "🔄"
-        
-        console.print(f"{i:2d}. {is_new} [cyan]{repo_name}[/cyan]")
-        console.print(f"    ⭐ {stars:,} stars | 📜 {license_name} | 🐍 {python_pct} Python")
-        console.print(f"    🔗 {url}")
-        if description:
-            console.print(f"    📝 {description}")
-        console.print()
+        table.add_row(
+            str(i),
+            "🆕" if repo.get('is_new', True) else "🔄",
+            f"{repo_name}\n[dim]{escape(description)}[/dim]" if description else repo_name,
+            f"{stars:,}",
+            repo.get('license', 'Unknown'),
+            repo.get('python_percentage', '0%'),
+            repo.get('url', '#')
+        )
+    
+    console.print(table)
+
+# Column order and fallback values for exported search results
+_CSV_DEFAULTS = (
+    ('repo_name', ''),
+    ('stars', 0),
+    ('license', ''),
+    ('py_files_estimate', 0),
+    ('python_percentage', ''),
+    ('url', ''),
+    ('passes_criteria', False),
+    ('is_new', True)
+)
+_CSV_FIELDS = tuple(field for field, _ in _CSV_DEFAULTS)
 
 def export_to_csv(results: List[Dict], filename: str):
     """Export GraphQL results to CSV"""
@@ -67,32 +91,17 @@ def export_to_csv(results: List[Dict], filename: str):
     try:
         import csv
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['repo_name', 'stars', 'license', 'py_files_estimate', 'python_percentage', 'url', 'passes_criteria', 'is_new']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for result in results:
-                writer.writerow({
-                    'repo_name': result.get('repo_name', ''),
-                    'stars': result.get('stars', 0),
-                    'license': result.get('license', ''),
-                    'py_files_estimate': result.get('py_files_estimate', 0),
-                    'python_percentage': result.get('python_percentage', ''),
-                    'url': result.get('url', ''),
-                    'passes_criteria': result.get('passes_criteria', False),
-                    'is_new': result.get('is_new', True)
-                })
+            writer = csv.writer(csvfile)
+            writer.writerow(_CSV_FIELDS)
+            writer.writerows(
+                tuple(result.get(field, default) for field, default in _CSV_DEFAULTS)
+                for result in results
+            )
         
         console.print(f"✅ Results exported to {filename}", style="green")
     except Exception as e:
         console.print(f"❌ Error exporting to CSV: {e}", style="red")
 
-def normalize_license(license_name):
-    """Normalize license names for comparison"""
-    if not license_name:
-        return ""
-    return license_name.upper().replace('-', '').replace(' ', '').replace('_', '').replace('LICENSE', '').replace('V', '').replace('.', '').strip()
-
 def check_license_compatibility(license_info):
     """Enhanced license compatibility check"""
     if not license_info:
@@ -101,42 +110,17 @@ def check_license_compatibility(license_info):
     license_name = license_info.get('name', '')
     license_spdx = license_info.get('spdx_id', '')
     
-    license_mappings = {
-        'APACHE LICENSE 2.0': 'Apache-2.0',
-        'APACHE LICENSE': 'Apache-2.0',
-        'APACHE 2.0': 'Apache-2.0',
-        'APACHE2.0': 'Apache-2.0',
-        'APACHE-2': 'Apache-2.0',
-        'MIT LICENSE': 'MIT',
-        'THE MIT LICENSE': 'MIT',
-        'BSD 3-CLAUSE': 'BSD-3-Clause',
-        'BSD 3 CLAUSE': 'BSD-3-Clause',
-        'BSD3CLAUSE': 'BSD-3-Clause',
-        'BSD 2-CLAUSE': 'BSD-2-Clause',
-        'BSD 2 CLAUSE': 'BSD-2-Clause',
-        'BSD2CLAUSE': 'BSD-2-Clause',
-        'BOOST SOFTWARE LICENSE': 'BSL-1.0',
-        'BOOST SOFTWARE LICENSE 1.0': 'BSL-1.0'
-    }
-    
     if license_spdx:
-        for allowed in ALLOWED_LICENSES:
-            if license_spdx.upper().replace('-', '').replace('_', '') == allowed.upper().replace('-', '').replace('_', ''):
-                return True, license_spdx, allowed
+        normalized_spdx = normalize_license(license_spdx)
+        if normalized_spdx in ALLOWED_LICENSES_NORMALIZED:
+            return True, license_spdx, LICENSE_CANONICAL[normalized_spdx]
     
     if license_name:
         normalized_name = normalize_license(license_name)
         
-        if normalized_name in [normalize_license(k) for k in license_mappings.keys()]:
-            for key, value in license_mappings.items():
-                if normalized_name == normalize_license(key):
-                    for allowed in ALLOWED_LICENSES:
-                        if normalize_license(value) == normalize_license(allowed):
-                            return True, license_name, allowed
-        
-        for allowed in ALLOWED_LICENSES:
-            if normalized_name == normalize_license(allowed):
-                return True, license_name, allowed
+        allowed = LICENSE_MAPPINGS_NORMALIZED.get(normalized_name) or LICENSE_CANONICAL.get(normalized_name)
+        if allowed:
+            return True, license_name, allowed
     
     return False, license_name or license_spdx or "Unknown", ""
 
@@ -148,7 +132,8 @@ def search(
     days_filter: int = typer.Option(7, "--days-filter", help="Filter repos shown in last N days"),
     fresh_only: bool = typer.Option(True, "--fresh-only/--allow-repeats", help="Only show repos you haven't seen"),
     export_csv: bool = typer.Option(DEFAULT_EXPORT_CSV, "--export-csv", help="Export results to CSV"),
-    force_refresh: bool = typer.Option(False, "--force-refresh", help="Show all repos, ignore recent filter")
+    force_refresh: bool = typer.Option(False, "--force-refresh", help="Show all repos, ignore recent filter"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the on-disk GitHub response cache")
 ):
     """Ultra-fast GitHub repository search with user-specific database tracking"""
     console.print("⚡ [bold]Ultra-Fast GitHub Search[/bold]", style="green")
@@ -162,16 +147,22 @@ def search(
         console.print("❌ limit must be between 1 and 100", style="red")
         return
     
+    # Network and analysis modules are only needed here; importing them lazily keeps other commands fast
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .github_client import GitHubClient
+    from .repo_analyzer import RepositoryAnalyzer
+    
     # Initialize user-specific services
-    github = GitHubClient()
-    analyzer = RepositoryAnalyzer()
-    db = RepositoryDatabase()  # Automatically uses current user
+    github = GitHubClient(use_cache=not no_cache)
+    analyzer = RepositoryAnalyzer(github)
+    db = _get_db()  # Automatically uses current user
+    user_id = getattr(db, 'user_id', 'default')
     
     # Get search offset for fresh results
     search_criteria = {'min_stars': min_stars, 'max_stars': max_stars, 'limit': limit}
     search_offset = db.get_last_search_offset(search_criteria) if hasattr(db, 'get_last_search_offset') else 0
     
-    console.print(f"👤 User: {db.user_id if hasattr(db, 'user_id') else 'default'}")
+    console.print(f"👤 User: {user_id}")
     if search_offset > 0:
         console.print(f"🔄 Search offset: {search_offset} (for fresh GitHub results)")
     
@@ -180,24 +171,44 @@ def search(
         max_attempts = 3 if fresh_only and not force_refresh else 1
         all_candidates = []
         
-        for attempt in range(max_attempts):
+        def run_attempt(attempt: int) -> Dict:
             current_offset = search_offset + (attempt * limit)
             
-            with Progress(SpinnerColumn(), TextColumn("🚀 Searching GitHub for fresh repos...")) as progress:
-                task = progress.add_task("Searching...", total=1)
-                
-                # Use enhanced search if available, otherwise fallback to standard
-                if hasattr(github, 'search_with_randomization'):
-                    search_result = github.search_with_randomization(min_stars, max_stars, limit, current_offset)
-                else:
-                    search_result = github.search_repositories_graphql(min_stars, max_stars, limit)
-                
-                progress.advance(task)
+            # Use enhanced search if available, otherwise fallback to standard
+            if hasattr(github, 'search_with_randomization'):
+                return github.search_with_randomization(min_stars, max_stars, limit, current_offset)
+            return github.search_repositories_graphql(min_stars, max_stars, limit)
+        
+        # Attempts use different offsets and don't depend on each other, so fetch them concurrently
+        with Progress(SpinnerColumn(), TextColumn("🚀 Searching GitHub for fresh repos...")) as progress:
+            task = progress.add_task("Searching...", total=max_attempts)
+            
+            with ThreadPoolExecutor(max_workers=max_attempts) as executor:
+                futures = [executor.submit(run_attempt, attempt) for attempt in range(max_attempts)]
+                search_results = []
+                for future in futures:
+                    try:
+                        search_results.append(future.result())
+                    except Exception as e:
+                        search_results.append(e)
+                    progress.advance(task)
+        
+        failures = [result for result in search_results if isinstance(result, Exception)]
+        if len(failures) == len(search_results):
+            raise failures[0]
+        
+        for attempt, search_result in enumerate(search_results):
+            if isinstance(search_result, Exception):
+                console.print(f"⚠️ Search attempt {attempt + 1} failed: {search_result}", style="yellow")
+                continue
             
             repos = search_result['repositories']
             rate_limit = search_result['rate_limit']
             
-            console.print(f"✅ Rate limit remaining: {rate_limit['remaining']} (cost: {rate_limit['cost']})")
+            if rate_limit:
+                console.print(f"✅ Rate limit remaining: {rate_limit['remaining']} (cost: {rate_limit['cost']})")
+            else:
+                console.print("✅ Served from cache (no rate limit used)")
             
             if not repos:
                 console.print("❌ No repositories found with those criteria", style="yellow")
@@ -240,14 +251,11 @@ def search(
             console.print("💡 Or: change --min-stars and --max-stars range", style="blue")
             return
         
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_candidates = []
+        # Remove duplicates (dict keeps first-seen order)
+        unique = {}
         for repo in all_candidates:
-            if repo['repo_name'] not in seen:
-                seen.add(repo['repo_name'])
-                repo['is_new'] = True  # Mark as new for this search
-                unique_candidates.append(repo)
+            unique.setdefault(repo['repo_name'], repo)
+        unique_candidates = list(unique.values())
         
         # Save to user-specific database
         if unique_candidates:
@@ -263,7 +271,6 @@ def search(
         # Export if requested
         if export_csv:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            user_id = db.user_id if hasattr(db, 'user_id') else 'user'
             filename = f"fresh_repos_{user_id}_{timestamp}.csv"
             export_to_csv(unique_candidates, filename)
         
@@ -273,29 +280,32 @@ def search(
 
 @app.command()
 def analyze(
-    repo_url: str = typer.Argument(..., help="GitHub repository URL or owner/repo format")
+    repo_url: str = typer.Argument(..., help="GitHub repository URL or owner/repo format"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the on-disk GitHub response cache")
 ):
     """Deep analysis of repository suitability for SWE Challenge V3"""
     
     # Parse repository URL/format
-    if 'github.com' in repo_url:
-        parts = repo_url.split('/')
-        owner, repo = parts[-2], parts[-1]
-    elif '/' in repo_url:
-        owner, repo = repo_url.split('/')
-    else:
+    match = _REPO_URL_RE.match(repo_url.strip())
+    if not match:
         console.print("❌ Invalid format. Use: owner/repo or full GitHub URL", style="red")
         return
+    owner, repo = match.groups()
     
     console.print(f"🔍 [bold]Analyzing {owner}/{repo} for SWE Challenge V3 suitability...[/bold]", style="green")
     
+    import requests
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .github_client import GitHubClient
+    from .repo_analyzer import RepositoryAnalyzer
+    
     try:
         # Use the comprehensive analyzer instead of manual analysis
         with Progress(SpinnerColumn(), TextColumn("Performing deep repository analysis...")) as progress:
             task = progress.add_task("Analyzing...", total=1)
             
             # Initialize the sophisticated analyzer
-            analyzer = RepositoryAnalyzer()
+            analyzer = RepositoryAnalyzer(GitHubClient(use_cache=not no_cache))
             
             # Use the comprehensive analysis method
             analysis = analyzer.analyze_repository_deep(owner, repo)
@@ -381,7 +391,7 @@ def analyze(
         # Save to database if analysis was successful
         if analysis['overall_score'] > 0:
             try:
-                db = RepositoryDatabase()
+                db = _get_db()
                 repo_data = {
                     'repo_name': f"{owner}/{repo}",
                     'stars': analysis.get('stars', 0),
@@ -408,7 +418,9 @@ def analyze(
 @app.command()
 def stats():
     """Show user-specific database statistics and history"""
-    db = RepositoryDatabase()
+    from rich.table import Table
+    
+    db = _get_db()
     stats = db.get_statistics()
     
     console.print("📊 [bold]Repository Database Statistics[/bold]", style="green")
@@ -440,7 +452,7 @@ def cleanup(
         console.print("⚠️ This will delete old repository data. Use --confirm to proceed.", style="yellow")
         return
     
-    db = RepositoryDatabase()
+    db = _get_db()
     deleted = db.cleanup_old_data(days_to_keep) if hasattr(db, 'cleanup_old_data') else 0
     console.print(f"🗑️ Database cleanup complete. Removed {deleted} old entries.", style="green")
 
@@ -453,7 +465,7 @@ def reset(
         console.print("⚠️ This will delete ALL your tracked repositories. Use --confirm to proceed.", style="yellow")
         return
     
-    db = RepositoryDatabase()
+    db = _get_db()
     
     # If user-specific reset method exists, use it
     if hasattr(db, 'reset_user_data'):
@@ -509,14 +521,17 @@ def export_db(
     show_summary: bool = typer.Option(True, "--summary/--no-summary", help="Show summary table")
 ):
     """Export database to human-readable format"""
-    db = RepositoryDatabase()
+    from .dataBaseExporter import DatabaseExporter
+    
+    db = _get_db()
     exporter = DatabaseExporter(db.db_path)
     
     # Get current user ID
-    user_id = db.user_id if hasattr(db, 'user_id') else 'default_user'
+    user_id = getattr(db, 'user_id', 'default_user')
     
     # Get repositories
-    repositories = exporter.get_user_repositories(user_id)
+    # CSV only needs the flattened criteria columns, so skip per-row JSON parsing for it
+    repositories = exporter.get_user_repositories(user_id, parse_criteria=format.lower() != "csv")
     
     if not repositories:
         console.print(f"❌ No repositories found for user: {user_id}", style="red")
@@ -525,7 +540,7 @@ def export_db(
     # Show summary if requested
     if show_summary:
         exporter.display_summary(repositories)
-        stats = exporter.get_statistics(repositories)
+        stats = exporter.get_statistics(user_id)
         
         console.print(f"\n📊 [bold]Database Statistics:[/bold]")
         console.print(f"   • Total: {stats['total_repositories']} repositories")
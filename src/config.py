@@ -7,6 +7,9 @@ load_dotenv()
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_BASE_URL = "https://api.github.com"
 
+# Fraction of successful API requests that get logged (errors are always logged)
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+
 DEFAULT_LIMIT = 100
 DEFAULT_EXPORT_CSV = False
 MIN_STARS = 500
@@ -16,6 +19,10 @@ MAX_PY_FILES = 100
 MAX_REPO_SIZE_KB = 100000
 MAX_TOTAL_FILES = 500
 CACHE_TTL_HOURS = 24
+SEARCH_CACHE_TTL_SECONDS = 3600
+
+# On-disk cache of GitHub GraphQL responses (disable per run with --no-cache)
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", ".cache/github.db")
 MAX_CONCURRENT_REQUESTS = 10
 REQUEST_TIMEOUT = 30
 
@@ -72,3 +79,40 @@ ALLOWED_LICENSES = {
     "GPL-2.0-with-classpath-exception",
     "GPL-3.0-with-autoconf-exception"
 }
+
+# Common license names mapped to their SPDX identifier
+LICENSE_MAPPINGS = {
+    'APACHE LICENSE 2.0': 'Apache-2.0',
+    'APACHE LICENSE': 'Apache-2.0',
+    'APACHE 2.0': 'Apache-2.0',
+    'APACHE2.0': 'Apache-2.0',
+    'APACHE-2': 'Apache-2.0',
+    'MIT LICENSE': 'MIT',
+    'THE MIT LICENSE': 'MIT',
+    'BSD 3-CLAUSE': 'BSD-3-Clause',
+    'BSD 3 CLAUSE': 'BSD-3-Clause',
+    'BSD3CLAUSE': 'BSD-3-Clause',
+    'BSD 2-CLAUSE': 'BSD-2-Clause',
+    'BSD 2 CLAUSE': 'BSD-2-Clause',
+    'BSD2CLAUSE': 'BSD-2-Clause',
+    'BOOST SOFTWARE LICENSE': 'BSL-1.0',
+    'BOOST SOFTWARE LICENSE 1.0': 'BSL-1.0'
+}
+
+# Separators dropped in a single pass by normalize_license
+_LICENSE_TRANS = str.maketrans('', '', '-_ .')
+
+def normalize_license(license_name):
+    """Normalize license names for comparison"""
+    if not license_name:
+        return ""
+    return license_name.upper().translate(_LICENSE_TRANS).replace('LICENSE', '').replace('V', '').strip()
+
+# Normalized lookup tables, built once so license checks are plain dict/set hits
+LICENSE_CANONICAL = {normalize_license(allowed): allowed for allowed in ALLOWED_LICENSES}
+ALLOWED_LICENSES_NORMALIZED = frozenset(LICENSE_CANONICAL)
+LICENSE_MAPPINGS_NORMALIZED = {
+    normalize_license(name): LICENSE_CANONICAL[normalize_license(spdx)]
+    for name, spdx in LICENSE_MAPPINGS.items()
+    if normalize_license(spdx) in ALLOWED_LICENSES_NORMALIZED
+}
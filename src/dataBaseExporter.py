@@ -1,67 +1,86 @@
 import sqlite3
-import json
+import orjson
 import csv
 import yaml
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from contextlib import closing
+from typing import List, Dict, Iterator, Optional
 from rich.console import Console
 from rich.table import Table
+from .database import connect
 
 console = Console()
 
+# Exports issue many small writes; a 1 MiB buffer turns them into few write syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
+# libyaml's C emitter when PyYAML was built with it, otherwise the pure-Python one
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Column order for CSV exports: the stored repository fields, then the flattened search criteria
+_REPO_FIELDS = (
+    'repo_name', 'stars', 'license', 'py_files_estimate', 'python_percentage',
+    'url', 'description', 'first_shown', 'last_shown', 'show_count', 'passes_criteria'
+)
+CSV_FIELDS = _REPO_FIELDS + ('search_min_stars', 'search_max_stars', 'search_limit')
+
+# search_criteria fields flattened by SQLite's JSON1 functions (malformed JSON yields NULLs)
+_CRITERIA_COLUMNS = """
+    CASE WHEN json_valid(search_criteria) THEN json_extract(search_criteria, '$.min_stars') END AS search_min_stars,
+    CASE WHEN json_valid(search_criteria) THEN json_extract(search_criteria, '$.max_stars') END AS search_max_stars,
+    CASE WHEN json_valid(search_criteria) THEN json_extract(search_criteria, '$.limit') END AS search_limit
+"""
+
 class DatabaseExporter:
     """Export repository database to human-readable formats"""
     
     def __init__(self, db_path: str = "repositories.db"):
         self.db_path = db_path
     
-    def get_user_repositories(self, user_id: str) -> List[Dict]:
+    def iter_user_repositories(self, user_id: str, parse_criteria: bool = True) -> Iterator[Dict]:
+        """Yield a user's repositories one row at a time, most recently shown first
+        
+        By default search_criteria comes back parsed into a dict; pass parse_criteria=False to
+        get flat search_min_stars/search_max_stars/search_limit columns extracted by SQLite
+        instead (what the CSV export writes).
+        """
+        with closing(connect(self.db_path)) as conn:
+            conn.row_factory = sqlite3.Row
+            
+            # Get user-specific table name
+            table_name = f"user_repositories_{user_id}"
+            
+            # Check if table exists
+            if not conn.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name=?
+            """, (table_name,)).fetchone():
+                return
+            
+            # Stream repositories straight off the cursor instead of materializing fetchall()
+            cursor = conn.execute(f"""
+                SELECT repo_name, stars, license, py_files_estimate, python_percentage, 
+                       url, description, first_shown, last_shown, show_count, passes_criteria,
+                       {"search_criteria" if parse_criteria else _CRITERIA_COLUMNS}
+                FROM {table_name}
+                ORDER BY last_shown DESC
+            """)
+            
+            for row in cursor:
+                repo_dict = dict(row)
+                # Parse search_criteria JSON if it exists
+                if parse_criteria and repo_dict['search_criteria']:
+                    try:
+                        repo_dict['search_criteria'] = orjson.loads(repo_dict['search_criteria'])
+                    except orjson.JSONDecodeError:
+                        pass
+                yield repo_dict
+    
+    def get_user_repositories(self, user_id: str, parse_criteria: bool = True) -> List[Dict]:
         """Get all repositories for a specific user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get user-specific table name
-                table_name = f"user_repositories_{user_id}"
-                
-                # Check if table exists
-                cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name=?
-                """, (table_name,))
-                
-                if not cursor.fetchone():
-                    return []
-                
-                # Get all repositories with detailed info
-                cursor.execute(f"""
-                    SELECT repo_name, stars, license, py_files_estimate, python_percentage, 
-                           url, description, first_shown, last_shown, show_count, passes_criteria,
-                           search_criteria
-                    FROM {table_name}
-                    ORDER BY last_shown DESC
-                """)
-                
-                rows = cursor.fetchall()
-                columns = ['repo_name', 'stars', 'license', 'py_files_estimate', 'python_percentage', 
-                          'url', 'description', 'first_shown', 'last_shown', 'show_count', 
-                          'passes_criteria', 'search_criteria']
-                
-                # Convert to list of dictionaries
-                repositories = []
-                for row in rows:
-                    repo_dict = dict(zip(columns, row))
-                    # Parse search_criteria JSON if it exists
-                    if repo_dict['search_criteria']:
-                        try:
-                            repo_dict['search_criteria'] = json.loads(repo_dict['search_criteria'])
-                        except:
-                            pass
-                    repositories.append(repo_dict)
-                
-                return repositories
-                
+            return list(self.iter_user_repositories(user_id, parse_criteria))
         except Exception as e:
             console.print(f"❌ Error reading database: {e}", style="red")
             return []
@@ -78,8 +97,9 @@ class DatabaseExporter:
                 "repositories": repositories
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False, default=str)
+            # orjson emits UTF-8 bytes directly; str() covers any value it can't serialize natively
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(export_data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
             console.print(f"✅ Exported {len(repositories)} repositories to {filename}", style="green")
             return True
@@ -95,25 +115,10 @@ class DatabaseExporter:
                 console.print("❌ No repositories to export", style="red")
                 return False
             
-            # Flatten search_criteria for CSV
-            flattened_repos = []
-            for repo in repositories:
-                flat_repo = repo.copy()
-                if isinstance(repo.get('search_criteria'), dict):
-                    # Add search criteria as separate columns
-                    search_criteria = repo['search_criteria']
-                    flat_repo['search_min_stars'] = search_criteria.get('min_stars', '')
-                    flat_repo['search_max_stars'] = search_criteria.get('max_stars', '')
-                    flat_repo['search_limit'] = search_criteria.get('limit', '')
-                flat_repo.pop('search_criteria', None)
-                flattened_repos.append(flat_repo)
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                if flattened_repos:
-                    fieldnames = flattened_repos[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(flattened_repos)
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_FIELDS)
+                writer.writerows(self._csv_row(repo) for repo in repositories)
             
             console.print(f"✅ Exported {len(repositories)} repositories to {filename}", style="green")
             return True
@@ -122,6 +127,20 @@ class DatabaseExporter:
             console.print(f"❌ Error exporting to CSV: {e}", style="red")
             return False
     
+    @staticmethod
+    def _csv_row(repo: Dict) -> tuple:
+        """Flatten one repository into CSV_FIELDS order"""
+        search_criteria = repo.get('search_criteria')
+        if isinstance(search_criteria, dict):
+            criteria = (
+                search_criteria.get('min_stars', ''),
+                search_criteria.get('max_stars', ''),
+                search_criteria.get('limit', '')
+            )
+        else:
+            criteria = (repo.get('search_min_stars'), repo.get('search_max_stars'), repo.get('search_limit'))
+        return tuple(repo.get(field) for field in _REPO_FIELDS) + criteria
+    
     def export_to_yaml(self, repositories: List[Dict], filename: str):
         """Export repositories to YAML format"""
         try:
@@ -134,8 +153,8 @@ class DatabaseExporter:
                 "repositories": repositories
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                yaml.dump(export_data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+                yaml.dump(export_data, f, Dumper=YAML_DUMPER, default_flow_style=False, allow_unicode=True, sort_keys=False)
             
             console.print(f"✅ Exported {len(repositories)} repositories to {filename}", style="green")
             return True
@@ -147,24 +166,27 @@ class DatabaseExporter:
     def export_to_markdown(self, repositories: List[Dict], filename: str):
         """Export repositories to Markdown format"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
+            with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
                 f.write(f"# Repository Database Export\n\n")
                 f.write(f"**Exported:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"**Total Repositories:** {len(repositories)}\n\n")
                 
+                # One write per repository block instead of one per line
                 for i, repo in enumerate(repositories, 1):
-                    f.write(f"## {i}. {repo['repo_name']}\n\n")
-                    f.write(f"- **⭐ Stars:** {repo['stars']:,}\n")
-                    f.write(f"- **📜 License:** {repo['license']}\n")
-                    f.write(f"- **🐍 Python %:** {repo['python_percentage']}\n")
-                    f.write(f"- **📁 Est. Python Files:** {repo['py_files_estimate']}\n")
-                    f.write(f"- **👀 Times Shown:** {repo['show_count']}\n")
-                    f.write(f"- **✅ Passes Criteria:** {'Yes' if repo['passes_criteria'] else 'No'}\n")
-                    f.write(f"- **🔗 URL:** [{repo['repo_name']}]({repo['url']})\n")
-                    f.write(f"- **📝 Description:** {repo['description']}\n")
-                    f.write(f"- **📅 First Seen:** {repo['first_shown'][:10]}\n")
-                    f.write(f"- **📅 Last Seen:** {repo['last_shown'][:10]}\n\n")
-                    f.write("---\n\n")
+                    f.write(
+                        f"## {i}. {repo['repo_name']}\n\n"
+                        f"- **⭐ Stars:** {repo['stars']:,}\n"
+                        f"- **📜 License:** {repo['license']}\n"
+                        f"- **🐍 Python %:** {repo['python_percentage']}\n"
+                        f"- **📁 Est. Python Files:** {repo['py_files_estimate']}\n"
+                        f"- **👀 Times Shown:** {repo['show_count']}\n"
+                        f"- **✅ Passes Criteria:** {'Yes' if repo['passes_criteria'] else 'No'}\n"
+                        f"- **🔗 URL:** [{repo['repo_name']}]({repo['url']})\n"
+                        f"- **📝 Description:** {repo['description']}\n"
+                        f"- **📅 First Seen:** {repo['first_shown'][:10]}\n"
+                        f"- **📅 Last Seen:** {repo['last_shown'][:10]}\n\n"
+                        "---\n\n"
+                    )
             
             console.print(f"✅ Exported {len(repositories)} repositories to {filename}", style="green")
             return True
@@ -187,43 +209,59 @@ class DatabaseExporter:
         table.add_column("Last Seen", style="magenta")
         table.add_column("Times Shown", justify="right", style="red")
         
-        for repo in repositories[:20]:  # Show top 20
-            table.add_row(
-                repo['repo_name'],
-                f"{repo['stars']:,}",
-                repo['license'][:15] + "..." if len(repo['license']) > 15 else repo['license'],
-                repo['python_percentage'],
-                repo['last_shown'][:10],
-                str(repo['show_count'])
-            )
+        top = repositories[:20]  # Show top 20
+        
+        # Build each column in one pass, then add the rows together
+        names = [repo['repo_name'] for repo in top]
+        stars = [f"{repo['stars']:,}" for repo in top]
+        licenses = [name[:15] + "..." if len(name) > 15 else name for name in (repo['license'] for repo in top)]
+        percentages = [repo['python_percentage'] for repo in top]
+        last_seen = [repo['last_shown'][:10] for repo in top]
+        show_counts = [str(repo['show_count']) for repo in top]
+        
+        for row in zip(names, stars, licenses, percentages, last_seen, show_counts):
+            table.add_row(*row)
         
         console.print(table)
         
         if len(repositories) > 20:
             console.print(f"\n... and {len(repositories) - 20} more repositories")
     
-    def get_statistics(self, repositories: List[Dict]) -> Dict:
-        """Get statistics about the repositories"""
-        if not repositories:
-            return {}
-        
-        total = len(repositories)
-        passing = sum(1 for r in repositories if r['passes_criteria'])
+    def get_statistics(self, user_id: str) -> Dict:
+        """Get statistics about a user's repositories, aggregated inside SQLite"""
+        table_name = f"user_repositories_{user_id}"
         
-        # License distribution
-        licenses = {}
-        for repo in repositories:
-            license_name = repo['license']
-            licenses[license_name] = licenses.get(license_name, 0) + 1
-        
-        # Star distribution
-        stars = [repo['stars'] for repo in repositories]
-        avg_stars = sum(stars) / len(stars) if stars else 0
+        try:
+            with closing(connect(self.db_path)) as conn:
+                if not conn.execute("""
+                    SELECT name FROM sqlite_master 
+                    WHERE type='table' AND name=?
+                """, (table_name,)).fetchone():
+                    return {}
+                
+                total, passing, avg_stars, most_recent = conn.execute(f"""
+                    SELECT COUNT(*), SUM(passes_criteria != 0), AVG(stars), MAX(last_shown)
+                    FROM {table_name}
+                """).fetchone()
+                
+                if not total:
+                    return {}
+                
+                # License distribution
+                licenses = conn.execute(f"""
+                    SELECT license, COUNT(*) AS repo_count
+                    FROM {table_name}
+                    GROUP BY license
+                    ORDER BY repo_count DESC
+                """).fetchall()
+        except Exception as e:
+            console.print(f"❌ Error reading database: {e}", style="red")
+            return {}
         
         return {
             'total_repositories': total,
-            'passing_criteria': passing,
-            'average_stars': avg_stars,
-            'license_distribution': dict(sorted(licenses.items(), key=lambda x: x[1], reverse=True)),
-            'most_recent': repositories[0]['last_shown'][:10] if repositories else 'None'
+            'passing_criteria': passing or 0,
+            'average_stars': avg_stars or 0,
+            'license_distribution': dict(licenses),
+            'most_recent': most_recent[:10] if most_recent else 'None'
         }
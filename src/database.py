@@ -1,164 +1,365 @@
 import sqlite3
-import json
+import orjson
 import os
+import re
 import hashlib
-from datetime import datetime, timedelta
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
 from rich.console import Console
 
 console = Console()
 
+# Applied to every connection: WAL lets readers run alongside a writer, NORMAL sync skips
+# the per-commit fsync (safe under WAL), and a larger page cache plus mmap cut read syscalls
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+"""
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    """Open a SQLite connection with the shared performance PRAGMAs applied"""
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.executescript(_CONNECTION_PRAGMAS)
+    return conn
+
+# How long get_statistics may serve its cached counts when nothing was written in between
+STATS_CACHE_TTL_SECONDS = 60
+
+# Long-lived instances refresh planner statistics at most this often from the write path
+OPTIMIZE_INTERVAL_SECONDS = 3600
+
+# Characters that can't appear in the per-user table names
+_UNSAFE_USER_ID_CHARS = re.compile(r'[^A-Za-z0-9_]')
+
+# Bump when the per-user tables or indexes change so existing users pick up the new DDL
+SCHEMA_VERSION = 1
+
 class RepositoryDatabase:
     """User-specific SQLite database for tracking shown repositories"""
     
     def __init__(self, db_path: str = "repositories.db", user_id: str = None):
         self.db_path = db_path
-        # Create user-specific identifier (use system username if not provided)
-        self.user_id = user_id or os.getenv('USER') or os.getenv('USERNAME') or 'default_user'
+        # Create user-specific identifier (use system username if not provided). It becomes part of
+        # every table name, so anything but letters, digits and '_' is replaced
+        raw_user_id = user_id or os.getenv('USER') or os.getenv('USERNAME') or 'default_user'
+        self.user_id = _UNSAFE_USER_ID_CHARS.sub('_', raw_user_id)[:64]
+        self._stats_cache = None
+        self._stats_cached_at = 0.0
+        self._optimized_at = time.monotonic()
+        self._prepare_statements()
+        
+        # One connection for the lifetime of the instance; the lock serializes use across threads
+        self._conn = connect(self.db_path, check_same_thread=False, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
         self.init_database()
     
+    def _prepare_statements(self):
+        """Build the per-user SQL once so every call hits the connection's statement cache"""
+        repos_table = f"user_repositories_{self.user_id}"
+        history_table = f"user_search_history_{self.user_id}"
+        
+        self._sql_last_offset = f"""
+        SELECT MAX(search_offset) FROM {history_table}
+        WHERE min_stars = ? AND max_stars = ?
+        AND search_timestamp > datetime('now', '-1 day')
+        """
+        self._sql_upsert = f"""
+        INSERT INTO {repos_table}
+        (repo_name, stars, license, py_files_estimate, python_percentage,
+         url, description, search_criteria, passes_criteria, analysis_score)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(repo_name) DO UPDATE SET
+            last_shown = CURRENT_TIMESTAMP,
+            show_count = show_count + 1,
+            stars = excluded.stars,
+            license = excluded.license,
+            py_files_estimate = excluded.py_files_estimate,
+            python_percentage = excluded.python_percentage,
+            description = excluded.description,
+            analysis_score = excluded.analysis_score
+        """
+        self._sql_log_search = f"""
+        INSERT INTO {history_table}
+        (min_stars, max_stars, limit_requested, repos_found, new_repos_shown, search_criteria, search_offset)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        self._sql_get_shown = f"""
+        SELECT repo_name FROM {repos_table}
+        WHERE last_shown > datetime('now', ?)
+        ORDER BY last_shown DESC
+        """
+        self._sql_filter_new = f"""
+        SELECT c.repo_name FROM temp.candidate_repos c
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {repos_table} u
+            WHERE u.repo_name = c.repo_name AND u.last_shown > datetime('now', ?)
+        )
+        """
+        self._sql_count_repos = f"SELECT COUNT(*) FROM {repos_table}"
+        self._sql_count_passing = f"SELECT COUNT(*) FROM {repos_table} WHERE passes_criteria = 1"
+        self._sql_count_recent = f"""
+        SELECT COUNT(*) FROM {repos_table}
+        WHERE last_shown > datetime('now', '-7 days')
+        """
+        self._sql_count_searches = f"SELECT COUNT(*) FROM {history_table}"
+        self._sql_avg_score = f"""
+        SELECT AVG(analysis_score) FROM {repos_table}
+        WHERE analysis_score IS NOT NULL
+        """
+        self._sql_top_analyzed = f"""
+        SELECT repo_name, stars, license, analysis_score, url, description, last_shown
+        FROM {repos_table}
+        WHERE analysis_score IS NOT NULL
+        ORDER BY analysis_score DESC, stars DESC
+        LIMIT ?
+        """
+        self._sql_cleanup_repos = f"""
+        DELETE FROM {repos_table}
+        WHERE last_shown < datetime('now', ?) AND analysis_score IS NULL
+        """
+        self._sql_cleanup_history = f"""
+        DELETE FROM {history_table}
+        WHERE search_timestamp < datetime('now', ?)
+        """
+        self._sql_get_by_name = f"""
+        SELECT repo_name, stars, license, py_files_estimate, python_percentage,
+               url, description, first_shown, last_shown, show_count,
+               passes_criteria, analysis_score, search_criteria
+        FROM {repos_table}
+        WHERE repo_name = ?
+        """
+        self._sql_with_analysis = f"""
+        SELECT repo_name, stars, license, analysis_score, url, description,
+               last_shown, passes_criteria
+        FROM {repos_table}
+        WHERE analysis_score IS NOT NULL
+        ORDER BY analysis_score DESC, last_shown DESC
+        """
+        self._sql_update_score_and_criteria = f"""
+        UPDATE {repos_table}
+        SET analysis_score = ?, passes_criteria = ?, last_shown = CURRENT_TIMESTAMP
+        WHERE repo_name = ?
+        """
+        self._sql_update_score = f"""
+        UPDATE {repos_table}
+        SET analysis_score = ?, last_shown = CURRENT_TIMESTAMP
+        WHERE repo_name = ?
+        """
+    
     def init_database(self):
         """Initialize user-specific database tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            # User-specific repositories table
-            conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS user_repositories_{self.user_id} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                repo_name TEXT UNIQUE NOT NULL,
-                stars INTEGER,
-                license TEXT,
-                py_files_estimate INTEGER,
-                python_percentage TEXT,
-                url TEXT,
-                description TEXT,
-                first_shown TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_shown TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                show_count INTEGER DEFAULT 1,
-                search_criteria TEXT,
-                passes_criteria BOOLEAN,
-                analysis_score REAL  -- FIXED: Added missing analysis_score column
-            )
-            """)
-            
-            # User-specific search history
-            conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS user_search_history_{self.user_id} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                search_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                min_stars INTEGER,
-                max_stars INTEGER,
-                limit_requested INTEGER,
-                repos_found INTEGER,
-                new_repos_shown INTEGER,
-                search_criteria TEXT,
-                search_offset INTEGER DEFAULT 0
-            )
-            """)
-            
-            # Create indexes for better performance
-            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_repo_name_{self.user_id} ON user_repositories_{self.user_id}(repo_name)")
-            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_last_shown_{self.user_id} ON user_repositories_{self.user_id}(last_shown)")
-            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_analysis_score_{self.user_id} ON user_repositories_{self.user_id}(analysis_score)")
+        with self._lock, self._conn as conn:
+            # DDL takes the write lock, so skip it entirely once this user's schema is current
+            if self._schema_version(conn) >= SCHEMA_VERSION:
+                return
+            self._create_tables(conn)
+    
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Create this user's tables and indexes if missing and record the schema version"""
+        # User-specific repositories table
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS user_repositories_{self.user_id} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repo_name TEXT UNIQUE NOT NULL,
+            stars INTEGER,
+            license TEXT,
+            py_files_estimate INTEGER,
+            python_percentage TEXT,
+            url TEXT,
+            description TEXT,
+            first_shown TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_shown TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            show_count INTEGER DEFAULT 1,
+            search_criteria TEXT,
+            passes_criteria BOOLEAN,
+            analysis_score REAL  -- FIXED: Added missing analysis_score column
+        )
+        """)
+        
+        # User-specific search history
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS user_search_history_{self.user_id} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            search_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            min_stars INTEGER,
+            max_stars INTEGER,
+            limit_requested INTEGER,
+            repos_found INTEGER,
+            new_repos_shown INTEGER,
+            search_criteria TEXT,
+            search_offset INTEGER DEFAULT 0
+        )
+        """)
+        
+        # Create indexes for better performance
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_repo_name_{self.user_id} ON user_repositories_{self.user_id}(repo_name)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_last_shown_{self.user_id} ON user_repositories_{self.user_id}(last_shown)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_analysis_score_{self.user_id} ON user_repositories_{self.user_id}(analysis_score)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_user_passes_criteria_{self.user_id} ON user_repositories_{self.user_id}(passes_criteria)")
+        # Partial index matching get_top_analyzed_repositories' filter and ORDER BY, so top-N needs no sort
+        conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_user_score_stars_{self.user_id}
+        ON user_repositories_{self.user_id}(analysis_score DESC, stars DESC)
+        WHERE analysis_score IS NOT NULL
+        """)
+        
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_versions (user_id TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_versions (user_id, version) VALUES (?, ?)",
+            (self.user_id, SCHEMA_VERSION)
+        )
+    
+    def _schema_version(self, conn: sqlite3.Connection) -> int:
+        """Schema version recorded for this user, 0 if their tables were never created"""
+        try:
+            row = conn.execute("SELECT version FROM schema_versions WHERE user_id = ?", (self.user_id,)).fetchone()
+        except sqlite3.OperationalError:
+            # Database predates the schema_versions table
+            return 0
+        return row[0] if row else 0
+    
+    def optimize(self):
+        """Refresh query planner statistics for tables that changed enough to matter"""
+        with self._lock:
+            self._optimized_at = time.monotonic()
+            try:
+                self._conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                console.print(f"⚠️ Database error optimizing: {e}", style="dim red")
+    
+    def _recreate_if_missing(self, error: sqlite3.Error) -> bool:
+        """Recreate this user's tables if `error` says they are gone (e.g. dropped by another process)"""
+        if 'no such table' not in str(error):
+            return False
+        with self._lock, self._conn as conn:
+            self._create_tables(conn)
+        return True
+    
+    @contextmanager
+    def _transaction(self):
+        """Hold the instance lock inside a transaction, recreating this user's tables if they were dropped"""
+        with self._lock:
+            try:
+                with self._conn as conn:
+                    yield conn
+            except sqlite3.OperationalError as e:
+                # This call still fails; the next one finds the tables again
+                self._recreate_if_missing(e)
+                raise
+    
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.optimize()
+            self._conn.close()
+    
+    def _invalidate_statistics(self):
+        """Drop cached statistics after a write"""
+        self._stats_cache = None
     
     def get_last_search_offset(self, search_criteria: Dict) -> int:
         """Get the offset for pagination to ensure new results"""
         criteria_key = f"{search_criteria['min_stars']}_{search_criteria['max_stars']}"
         
-        with sqlite3.connect(self.db_path) as conn:
-            result = conn.execute(f"""
-            SELECT MAX(search_offset) FROM user_search_history_{self.user_id}
-            WHERE min_stars = ? AND max_stars = ?
-            AND search_timestamp > datetime('now', '-1 day')
-            """, (search_criteria['min_stars'], search_criteria['max_stars'])).fetchone()
+        with self._transaction() as conn:
+            result = conn.execute(self._sql_last_offset, (search_criteria['min_stars'], search_criteria['max_stars'])).fetchone()
             
             return (result[0] or 0) if result else 0
     
     def add_repositories(self, repos: List[Dict], search_criteria: Dict, search_offset: int = 0):
         """Add repositories to user-specific database with proper error handling"""
-        with sqlite3.connect(self.db_path) as conn:
-            for repo in repos:
+        criteria_json = orjson.dumps(search_criteria, default=str).decode()
+        
+        rows = [(
+            repo['repo_name'],
+            repo.get('stars', 0),
+            repo.get('license', ''),
+            repo.get('py_files_estimate', 0),
+            repo.get('python_percentage', ''),
+            repo.get('url', ''),
+            repo.get('description', ''),
+            criteria_json,
+            repo.get('passes_criteria', False),
+            repo.get('analysis_score', None)  # Handle the new field
+        ) for repo in repos]
+        
+        with self._transaction() as conn:
+            existing = set()
+            saved = []
+            try:
+                # Only needed to report how many repositories are new to this user
+                names = [row[0] for row in rows]
+                placeholders = ",".join("?" * len(names))
                 try:
-                    # Check if repository already exists for this user
-                    existing = conn.execute(f"""
-                    SELECT id, show_count FROM user_repositories_{self.user_id}
-                    WHERE repo_name = ?
-                    """, (repo['repo_name'],)).fetchone()
-                    
-                    if existing:
-                        # Update existing repository
-                        conn.execute(f"""
-                        UPDATE user_repositories_{self.user_id}
-                        SET last_shown = CURRENT_TIMESTAMP,
-                            show_count = show_count + 1,
-                            stars = ?,
-                            license = ?,
-                            py_files_estimate = ?,
-                            python_percentage = ?,
-                            description = ?,
-                            analysis_score = ?
-                        WHERE repo_name = ?
-                        """, (
-                            repo.get('stars', 0),
-                            repo.get('license', ''),
-                            repo.get('py_files_estimate', 0),
-                            repo.get('python_percentage', ''),
-                            repo.get('description', ''),
-                            repo.get('analysis_score', None),  # Handle the new field
-                            repo['repo_name']
-                        ))
-                    else:
-                        # Insert new repository for this user
-                        conn.execute(f"""
-                        INSERT INTO user_repositories_{self.user_id}
-                        (repo_name, stars, license, py_files_estimate, python_percentage,
-                         url, description, search_criteria, passes_criteria, analysis_score)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            repo['repo_name'],
-                            repo.get('stars', 0),
-                            repo.get('license', ''),
-                            repo.get('py_files_estimate', 0),
-                            repo.get('python_percentage', ''),
-                            repo.get('url', ''),
-                            repo.get('description', ''),
-                            json.dumps(search_criteria),
-                            repo.get('passes_criteria', False),
-                            repo.get('analysis_score', None)  # Handle the new field
-                        ))
-                except sqlite3.Error as e:
-                    console.print(f"⚠️ Database error for {repo.get('repo_name', 'unknown')}: {e}", style="dim red")
-                    continue
+                    existing = {row[0] for row in conn.execute(f"""
+                    SELECT repo_name FROM user_repositories_{self.user_id}
+                    WHERE repo_name IN ({placeholders})
+                    """, names)}
+                except sqlite3.OperationalError as e:
+                    # Tables dropped by another process (e.g. CLI reset): recreate them and save into those
+                    if not self._recreate_if_missing(e):
+                        raise
+                
+                # Insert new repositories and refresh already-seen ones in a single statement. If any
+                # row fails, the savepoint undoes the partial batch and the rows are retried one by
+                # one so a single bad repository doesn't cost the rest
+                conn.execute("SAVEPOINT add_repositories")
+                try:
+                    conn.executemany(self._sql_upsert, rows)
+                    saved = names
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK TO add_repositories")
+                    for row in rows:
+                        try:
+                            conn.execute(self._sql_upsert, row)
+                            saved.append(row[0])
+                        except sqlite3.Error as e:
+                            console.print(f"⚠️ Database error for {row[0]}: {e}", style="dim red")
+                finally:
+                    conn.execute("RELEASE add_repositories")
+            except sqlite3.Error as e:
+                console.print(f"⚠️ Database error saving {len(repos)} repositories: {e}", style="dim red")
+            
+            new_count = len(set(saved) - existing)
             
             # Log this search with offset
             try:
-                conn.execute(f"""
-                INSERT INTO user_search_history_{self.user_id}
-                (min_stars, max_stars, limit_requested, repos_found, new_repos_shown, search_criteria, search_offset)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
+                conn.execute(self._sql_log_search, (
                     search_criteria.get('min_stars', 0),
                     search_criteria.get('max_stars', 0),
                     search_criteria.get('limit', 0),
                     len(repos),
-                    len(repos),  # All are new in this context
-                    json.dumps(search_criteria),
+                    new_count,
+                    criteria_json,
                     search_offset
                 ))
             except sqlite3.Error as e:
                 console.print(f"⚠️ Could not log search history: {e}", style="dim red")
+        
+        # API instances live as long as the process, so don't leave optimize to close() alone
+        if time.monotonic() - self._optimized_at >= OPTIMIZE_INTERVAL_SECONDS:
+            self.optimize()
+        
+        self._invalidate_statistics()
     
     def get_shown_repositories(self, days_back: int = 30) -> List[str]:
         """Get list of repository names shown to this user in the last N days"""
-        cutoff_date = datetime.now() - timedelta(days=days_back)
+        # SQLite-side cutoff in the same UTC 'YYYY-MM-DD HH:MM:SS' form CURRENT_TIMESTAMP stores
+        cutoff = f'-{days_back} days'
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                results = conn.execute(f"""
-                SELECT repo_name FROM user_repositories_{self.user_id}
-                WHERE last_shown > ?
-                ORDER BY last_shown DESC
-                """, (cutoff_date.isoformat(),)).fetchall()
+            with self._transaction() as conn:
+                results = conn.execute(self._sql_get_shown, (cutoff,)).fetchall()
                 
                 return [row[0] for row in results]
         except sqlite3.Error as e:
@@ -167,8 +368,27 @@ class RepositoryDatabase:
     
     def filter_new_repositories(self, repos: List[Dict], days_back: int = 7) -> List[Dict]:
         """Filter out repositories that have been shown to this user recently"""
-        shown_repos = set(self.get_shown_repositories(days_back))
-        new_repos = [repo for repo in repos if repo['repo_name'] not in shown_repos]
+        if not repos:
+            return []
+        
+        cutoff = f'-{days_back} days'
+        
+        try:
+            with self._transaction() as conn:
+                # Anti-join the candidates against recent rows in SQLite so only the names that
+                # survive cross back into Python
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS candidate_repos (repo_name TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM temp.candidate_repos")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO temp.candidate_repos (repo_name) VALUES (?)",
+                    [(repo['repo_name'],) for repo in repos]
+                )
+                fresh_names = {row[0] for row in conn.execute(self._sql_filter_new, (cutoff,))}
+        except sqlite3.Error as e:
+            console.print(f"⚠️ Database error filtering shown repos: {e}", style="dim red")
+            fresh_names = {repo['repo_name'] for repo in repos}
+        
+        new_repos = [repo for repo in repos if repo['repo_name'] in fresh_names]
         
         filtered_count = len(repos) - len(new_repos)
         if filtered_count > 0:
@@ -178,24 +398,21 @@ class RepositoryDatabase:
     
     def get_statistics(self) -> Dict:
         """Get user-specific database statistics with error handling"""
+        if self._stats_cache is not None and time.monotonic() - self._stats_cached_at < STATS_CACHE_TTL_SECONDS:
+            return dict(self._stats_cache)
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                total_repos = conn.execute(f"SELECT COUNT(*) FROM user_repositories_{self.user_id}").fetchone()[0]
-                passing_repos = conn.execute(f"SELECT COUNT(*) FROM user_repositories_{self.user_id} WHERE passes_criteria = 1").fetchone()[0]
-                recent_repos = conn.execute(f"""
-                SELECT COUNT(*) FROM user_repositories_{self.user_id}
-                WHERE last_shown > datetime('now', '-7 days')
-                """).fetchone()[0]
-                total_searches = conn.execute(f"SELECT COUNT(*) FROM user_search_history_{self.user_id}").fetchone()[0]
+            with self._transaction() as conn:
+                total_repos = conn.execute(self._sql_count_repos).fetchone()[0]
+                passing_repos = conn.execute(self._sql_count_passing).fetchone()[0]
+                recent_repos = conn.execute(self._sql_count_recent).fetchone()[0]
+                total_searches = conn.execute(self._sql_count_searches).fetchone()[0]
                 
                 # Get average analysis score for repositories that have been analyzed
-                avg_score_result = conn.execute(f"""
-                SELECT AVG(analysis_score) FROM user_repositories_{self.user_id}
-                WHERE analysis_score IS NOT NULL
-                """).fetchone()
+                avg_score_result = conn.execute(self._sql_avg_score).fetchone()
                 avg_analysis_score = avg_score_result[0] if avg_score_result and avg_score_result[0] else 0
                 
-                return {
+                self._stats_cache = {
                     'user_id': self.user_id,
                     'total_repositories': total_repos,
                     'passing_repositories': passing_repos,
@@ -203,6 +420,8 @@ class RepositoryDatabase:
                     'total_searches': total_searches,
                     'average_analysis_score': round(avg_analysis_score, 2) if avg_analysis_score else 0
                 }
+                self._stats_cached_at = time.monotonic()
+                return dict(self._stats_cache)
         except sqlite3.Error as e:
             console.print(f"⚠️ Database error getting statistics: {e}", style="dim red")
             return {
@@ -217,48 +436,28 @@ class RepositoryDatabase:
     def get_top_analyzed_repositories(self, limit: int = 10) -> List[Dict]:
         """Get top repositories by analysis score"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"""
-                SELECT repo_name, stars, license, analysis_score, url, description, last_shown
-                FROM user_repositories_{self.user_id}
-                WHERE analysis_score IS NOT NULL
-                ORDER BY analysis_score DESC, stars DESC
-                LIMIT ?
-                """, (limit,))
-                
-                columns = ['repo_name', 'stars', 'license', 'analysis_score', 'url', 'description', 'last_shown']
-                results = []
-                
-                for row in cursor.fetchall():
-                    repo_dict = dict(zip(columns, row))
-                    results.append(repo_dict)
-                
-                return results
+            with self._transaction() as conn:
+                # Rows are sqlite3.Row already, keyed by the selected column names
+                return [dict(row) for row in conn.execute(self._sql_top_analyzed, (limit,))]
         except sqlite3.Error as e:
             console.print(f"⚠️ Database error getting top analyzed repos: {e}", style="dim red")
             return []
     
     def cleanup_old_data(self, days_to_keep: int = 90) -> int:
         """Clean up old repository data beyond specified days"""
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+        cutoff = f'-{days_to_keep} days'
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 # Clean old repositories (but keep analyzed ones)
-                repo_result = conn.execute(f"""
-                DELETE FROM user_repositories_{self.user_id}
-                WHERE last_shown < ? AND analysis_score IS NULL
-                """, (cutoff_date.isoformat(),))
+                repo_result = conn.execute(self._sql_cleanup_repos, (cutoff,))
                 
                 # Clean old search history
-                search_result = conn.execute(f"""
-                DELETE FROM user_search_history_{self.user_id}
-                WHERE search_timestamp < ?
-                """, (cutoff_date.isoformat(),))
+                search_result = conn.execute(self._sql_cleanup_history, (cutoff,))
                 
                 total_deleted = repo_result.rowcount + search_result.rowcount
                 conn.commit()
+                self._invalidate_statistics()
                 return total_deleted
         except sqlite3.Error as e:
             console.print(f"⚠️ Database error during cleanup: {e}", style="dim red")
@@ -267,10 +466,12 @@ class RepositoryDatabase:
     def reset_user_data(self):
         """Reset all data for the current user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 conn.execute(f"DROP TABLE IF EXISTS user_repositories_{self.user_id}")
                 conn.execute(f"DROP TABLE IF EXISTS user_search_history_{self.user_id}")
+                conn.execute("DELETE FROM schema_versions WHERE user_id = ?", (self.user_id,))
                 conn.commit()
+            self._invalidate_statistics()
                 
             # Reinitialize the database
             self.init_database()
@@ -285,9 +486,9 @@ class RepositoryDatabase:
             backup_path = f"backup_{self.user_id}_{timestamp}.db"
         
         try:
-            # Simple file copy backup
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            # Online page-level copy under SQLite's locking, consistent even with WAL frames pending
+            with closing(sqlite3.connect(backup_path)) as backup_conn, self._lock:
+                self._conn.backup(backup_conn)
             console.print(f"✅ Database backed up to: {backup_path}", style="green")
             return backup_path
         except Exception as e:
@@ -297,29 +498,20 @@ class RepositoryDatabase:
     def get_repository_by_name(self, repo_name: str) -> Optional[Dict]:
         """Get specific repository details by name"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
-                cursor.execute(f"""
-                SELECT repo_name, stars, license, py_files_estimate, python_percentage,
-                       url, description, first_shown, last_shown, show_count, 
-                       passes_criteria, analysis_score, search_criteria
-                FROM user_repositories_{self.user_id}
-                WHERE repo_name = ?
-                """, (repo_name,))
+                cursor.execute(self._sql_get_by_name, (repo_name,))
                 
                 row = cursor.fetchone()
                 if row:
-                    columns = ['repo_name', 'stars', 'license', 'py_files_estimate', 'python_percentage',
-                              'url', 'description', 'first_shown', 'last_shown', 'show_count',
-                              'passes_criteria', 'analysis_score', 'search_criteria']
-                    
-                    repo_dict = dict(zip(columns, row))
+                    # Keyed by the selected column names, like the other readers
+                    repo_dict = dict(row)
                     
                     # Parse search_criteria if it exists
                     if repo_dict['search_criteria']:
                         try:
-                            repo_dict['search_criteria'] = json.loads(repo_dict['search_criteria'])
-                        except json.JSONDecodeError:
+                            repo_dict['search_criteria'] = orjson.loads(repo_dict['search_criteria'])
+                        except orjson.JSONDecodeError:
                             repo_dict['search_criteria'] = {}
                     
                     return repo_dict
@@ -331,25 +523,8 @@ class RepositoryDatabase:
     def get_repositories_with_analysis(self) -> List[Dict]:
         """Get all repositories that have been analyzed (have analysis_score)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"""
-                SELECT repo_name, stars, license, analysis_score, url, description, 
-                       last_shown, passes_criteria
-                FROM user_repositories_{self.user_id}
-                WHERE analysis_score IS NOT NULL
-                ORDER BY analysis_score DESC, last_shown DESC
-                """)
-                
-                columns = ['repo_name', 'stars', 'license', 'analysis_score', 'url', 
-                          'description', 'last_shown', 'passes_criteria']
-                results = []
-                
-                for row in cursor.fetchall():
-                    repo_dict = dict(zip(columns, row))
-                    results.append(repo_dict)
-                
-                return results
+            with self._transaction() as conn:
+                return [dict(row) for row in conn.execute(self._sql_with_analysis)]
         except sqlite3.Error as e:
             console.print(f"⚠️ Database error getting analyzed repositories: {e}", style="dim red")
             return []
@@ -357,21 +532,14 @@ class RepositoryDatabase:
     def update_analysis_score(self, repo_name: str, analysis_score: float, passes_criteria: bool = None):
         """Update analysis score for a specific repository"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 if passes_criteria is not None:
-                    conn.execute(f"""
-                    UPDATE user_repositories_{self.user_id}
-                    SET analysis_score = ?, passes_criteria = ?, last_shown = CURRENT_TIMESTAMP
-                    WHERE repo_name = ?
-                    """, (analysis_score, passes_criteria, repo_name))
+                    cursor = conn.execute(self._sql_update_score_and_criteria, (analysis_score, passes_criteria, repo_name))
                 else:
-                    conn.execute(f"""
-                    UPDATE user_repositories_{self.user_id}
-                    SET analysis_score = ?, last_shown = CURRENT_TIMESTAMP
-                    WHERE repo_name = ?
-                    """, (analysis_score, repo_name))
+                    cursor = conn.execute(self._sql_update_score, (analysis_score, repo_name))
                 
-                if conn.total_changes > 0:
+                if cursor.rowcount > 0:
+                    self._invalidate_statistics()
                     console.print(f"✅ Updated analysis score for {repo_name}: {analysis_score:.1f}/5.0", style="dim green")
                     return True
                 else:
@@ -1,70 +1,327 @@
 import requests
+from requests.adapters import HTTPAdapter
+import orjson
 from typing import List, Dict, Optional
+import hashlib
 import random
+import threading
 import time
-from .config import GITHUB_TOKEN, GITHUB_BASE_URL
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from .config import (
+    GITHUB_TOKEN, GITHUB_BASE_URL, MAX_CONCURRENT_REQUESTS, REQUEST_TIMEOUT,
+    CACHE_TTL_HOURS, SEARCH_CACHE_TTL_SECONDS, GITHUB_CACHE_PATH
+)
+from .database import connect
+
+# Transient failures worth retrying; other 4xx responses are returned as-is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+
+def _int_header(headers, name: str) -> Optional[int]:
+    """Integer value of a response header, or None if absent/malformed"""
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class GraphQLError(Exception):
+    """GraphQL response whose errors left the requested data missing"""
+    
+    def __init__(self, errors: List[Dict]):
+        self.errors = errors
+        # e.g. NOT_FOUND, RATE_LIMITED, FORBIDDEN; None for errors GitHub doesn't classify
+        self.types = {error.get('type') for error in errors}
+        super().__init__(f"GraphQL errors: {errors}")
+
+class ConcurrencyController:
+    """AIMD cap on in-flight GitHub requests, driven by the rate-limit response headers
+    
+    Healthy responses raise the cap additively; a throttled response (429, or 403 with
+    no quota left) or a nearly exhausted quota halves it, and throttling also holds new
+    requests until Retry-After has passed, or x-ratelimit-reset once the quota is exhausted.
+    """
+    
+    INCREASE = 0.5
+    DECREASE = 0.5
+    LOW_QUOTA_FRACTION = 0.1
+    
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS):
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self._in_flight = 0
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+    
+    @contextmanager
+    def slot(self):
+        """Hold one request slot, waiting for capacity and for any throttle window to pass"""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+            delay = self._resume_at - time.monotonic()
+        
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+    
+    def record(self, response: requests.Response):
+        """Adjust the cap from one response's status and rate-limit headers"""
+        headers = response.headers
+        remaining = _int_header(headers, 'x-ratelimit-remaining')
+        quota = _int_header(headers, 'x-ratelimit-limit')
+        throttled = response.status_code == 429 or (response.status_code == 403 and remaining == 0)
+        low_quota = remaining is not None and bool(quota) and remaining < self.LOW_QUOTA_FRACTION * quota
+        
+        with self._cond:
+            if throttled or low_quota:
+                self.limit = max(1.0, self.limit * self.DECREASE)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + self.INCREASE)
+            
+            if throttled:
+                # Only an exhausted primary quota waits for its reset; secondary limits say how long in Retry-After
+                wait = _int_header(headers, 'retry-after') or random.uniform(RETRY_BASE_DELAY, 3 * RETRY_BASE_DELAY)
+                reset_at = _int_header(headers, 'x-ratelimit-reset')
+                if remaining == 0 and reset_at:
+                    wait = max(wait, reset_at - time.time())
+                self._resume_at = max(self._resume_at, time.monotonic() + wait)
+            
+            self._cond.notify_all()
+
+# Rate limits are per token, so every client in the process shares one controller
+_controller = ConcurrencyController()
+
+# How long repository details used by the deep analysis stay fresh
+DETAILS_CACHE_TTL_SECONDS = CACHE_TTL_HOURS * 3600
+
+class GQLCache:
+    """SQLite-backed cache of GraphQL response bodies keyed by a hash of query + variables"""
+    
+    def __init__(self, path: str = GITHUB_CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock, self._conn as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """)
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+    
+    @staticmethod
+    def key(query: str, variables: Optional[Dict]) -> str:
+        """Cache key for a query and its variables (variable order doesn't matter)"""
+        return hashlib.sha256(query.encode() + orjson.dumps(variables or {}, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached response body, or None if missing or expired"""
+        with self._lock, self._conn as conn:
+            row = conn.execute(
+                "SELECT body FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def put(self, key: str, value: Dict, ttl: float):
+        """Store a response body for ttl seconds"""
+        with self._lock, self._conn as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, expires_at) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), time.time() + ttl)
+            )
+
+@lru_cache(maxsize=1)
+def _shared_cache() -> GQLCache:
+    """One cache connection per process, opened on first use"""
+    return GQLCache()
+
+# Repository search page; the full and light queries differ only in their SearchFields fragment
+_SEARCH_PAGE = """
+query($searchQuery: String!, $first: Int!, $after: String) {
+  search(query: $searchQuery, type: REPOSITORY, first: $first, after: $after) {
+    nodes {
+      ...SearchFields
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    repositoryCount
+  }
+  rateLimit {
+    remaining
+    cost
+  }
+}
+"""
+
+_SEARCH_SUMMARY_FIELDS = """
+fragment SearchSummary on Repository {
+  nameWithOwner
+  stargazerCount
+  description
+  url
+  updatedAt
+  createdAt
+  pushedAt
+  licenseInfo {
+    spdxId
+    name
+  }
+}
+"""
+
+_SEARCH_QUERY = _SEARCH_PAGE + """
+fragment SearchFields on Repository {
+  ...SearchSummary
+  languages(first: 5) {
+    totalSize
+    edges {
+      node {
+        name
+      }
+      size
+    }
+  }
+  repositoryTopics(first: 10) {
+    nodes {
+      topic {
+        name
+      }
+    }
+  }
+}
+""" + _SEARCH_SUMMARY_FIELDS
+
+# Just what the fast analysis reads: Python can only pass the 70% filter as the largest language
+_LIGHT_SEARCH_QUERY = _SEARCH_PAGE + """
+fragment SearchFields on Repository {
+  ...SearchSummary
+  languages(first: 1, orderBy: {field: SIZE, direction: DESC}) {
+    totalSize
+    edges {
+      node {
+        name
+      }
+      size
+    }
+  }
+}
+""" + _SEARCH_SUMMARY_FIELDS
+
+_RATE_LIMIT_QUERY = """
+query {
+  rateLimit {
+    remaining
+    resetAt
+    cost
+  }
+}
+"""
 
 class GitHubClient:
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.token = GITHUB_TOKEN
         self.base_url = GITHUB_BASE_URL
+        self.graphql_url = f"{self.base_url}/graphql"
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        self.controller = _controller
+        self.cache = _shared_cache() if use_cache else None
+        
+        # Keep-alive pool sized to the concurrency cap so parallel requests reuse TCP/TLS connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=MAX_CONCURRENT_REQUESTS, pool_maxsize=MAX_CONCURRENT_REQUESTS, max_retries=0)
+        self.session.mount("https://", adapter)
     
-    def search_repositories_graphql(self, min_stars=500, max_stars=5000, limit=20, after_cursor: Optional[str] = None, sort: str = "stars") -> Dict:
-        """Enhanced GraphQL search with proper cursor-based pagination"""
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a GitHub API request under the shared concurrency controller, retrying transient failures
         
-        query = """
-        query($searchQuery: String!, $first: Int!, $after: String) {
-          search(query: $searchQuery, type: REPOSITORY, first: $first, after: $after) {
-            nodes {
-              ... on Repository {
-                nameWithOwner
-                stargazerCount
-                description
-                url
-                updatedAt
-                createdAt
-                pushedAt
-                licenseInfo {
-                  spdxId
-                  name
-                }
-                languages(first: 5) {
-                  totalSize
-                  edges {
-                    node {
-                      name
-                    }
-                    size
-                  }
-                }
-                repositoryTopics(first: 10) {
-                  nodes {
-                    topic {
-                      name
-                    }
-                  }
-                }
-              }
-            }
-            pageInfo {
-              hasNextPage
-              endCursor
-            }
-            repositoryCount
-          }
-          rateLimit {
-            remaining
-            cost
-          }
-        }
+        Blocks the calling thread between retries (up to RETRY_MAX_DELAY per attempt, longer while
+        throttled), so a single call can take minutes; async code must run it in a threadpool.
+        """
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        
+        delay = RETRY_BASE_DELAY
+        for attempt in range(MAX_RETRIES + 1):
+            retry_after = 0
+            try:
+                with self.controller.slot():
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == MAX_RETRIES:
+                    raise
+            else:
+                self.controller.record(response)
+                if not self._should_retry(response) or attempt == MAX_RETRIES:
+                    return response
+                retry_after = _int_header(response.headers, 'retry-after') or 0
+            
+            # Decorrelated jitter: each wait is drawn from [base, 3x the previous wait], capped
+            delay = min(RETRY_MAX_DELAY, random.uniform(RETRY_BASE_DELAY, delay * 3))
+            time.sleep(max(delay, retry_after))
+    
+    @staticmethod
+    def _should_retry(response: requests.Response) -> bool:
+        """Whether a response is a transient failure (5xx, 429, or a 403 for an exhausted quota)"""
+        if response.status_code in RETRY_STATUSES:
+            return True
+        return response.status_code == 403 and _int_header(response.headers, 'x-ratelimit-remaining') == 0
+    
+    def graphql(self, query: str, variables: Optional[Dict] = None, cache_ttl: Optional[float] = None) -> Dict:
+        """POST a GraphQL document and return the decoded response body (data and any errors)
+        
+        With cache_ttl set, an identical query answered within the last cache_ttl seconds is
+        served from the on-disk cache instead of GitHub, flagged with extensions.cached = True.
+        """
+        key = None
+        if self.cache is not None and cache_ttl:
+            key = self.cache.key(query, variables)
+            cached = self.cache.get(key)
+            if cached is not None:
+                cached.setdefault("extensions", {})["cached"] = True
+                return cached
+        
+        response = self._request("POST", self.graphql_url, json={"query": query, "variables": variables or {}})
+        
+        if response.status_code != 200:
+            raise Exception(f"GraphQL request failed: {response.status_code} - {response.text}")
+        
+        data = orjson.loads(response.content)
+        
+        # Only complete answers are worth replaying
+        if key is not None and "errors" not in data:
+            self.cache.put(key, data, cache_ttl)
+        
+        return data
+    
+    def search_repositories_graphql(self, min_stars=500, max_stars=5000, limit=20, after_cursor: Optional[str] = None, sort: str = "stars", topic: Optional[str] = None, light: bool = False) -> Dict:
+        """Enhanced GraphQL search with proper cursor-based pagination
+        
+        light=True fetches only the top language and no topics, which is all the fast analysis needs.
         """
         
-        # Build search query with proper sorting
+        # Build search query with optional topic filter and proper sorting
         search_query = f"language:Python stars:{min_stars}..{max_stars} archived:false fork:false"
+        if topic:
+            search_query += f" topic:{topic}"
         if sort != "stars":
             search_query += f" sort:{sort}"
         
@@ -74,24 +331,19 @@ class GitHubClient:
             "after": after_cursor
         }
         
-        response = requests.post(
-            "https://api.github.com/graphql",
-            json={"query": query, "variables": variables},
-            headers=self.headers,
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"GraphQL request failed: {response.status_code} - {response.text}")
-        
-        data = response.json()
+        query = _LIGHT_SEARCH_QUERY if light else _SEARCH_QUERY
+        data = self.graphql(query, variables, cache_ttl=SEARCH_CACHE_TTL_SECONDS)
         
         if "errors" in data:
-            raise Exception(f"GraphQL errors: {data['errors']}")
+            raise GraphQLError(data['errors'])
+        
+        # A cached page's rateLimit is as old as the page, so don't report it as the current quota
+        from_cache = data.get("extensions", {}).get("cached", False)
         
         return {
             'repositories': data["data"]["search"]["nodes"],
-            'rate_limit': data["data"]["rateLimit"],
+            'rate_limit': None if from_cache else data["data"]["rateLimit"],
+            'from_cache': from_cache,
             'page_info': data["data"]["search"]["pageInfo"],
             'repository_count': data["data"]["search"]["repositoryCount"],
             'search_query_used': search_query,
@@ -137,129 +389,38 @@ class GitHubClient:
             # For later attempts, try to get deeper pages
             after_cursor = self._get_cursor_for_attempt(search_attempt)
         
-        return self.search_repositories_graphql_with_topics(
-            actual_min, actual_max, limit, after_cursor, sort_param, topic
+        return self.search_repositories_graphql(
+            actual_min, actual_max, limit, after_cursor, sort_param, topic, light=True
         )
     
-    def search_repositories_graphql_with_topics(self, min_stars, max_stars, limit, after_cursor, sort, topic=None):
-        """Enhanced search that can include topic filtering"""
-        
-        query = """
-        query($searchQuery: String!, $first: Int!, $after: String) {
-          search(query: $searchQuery, type: REPOSITORY, first: $first, after: $after) {
-            nodes {
-              ... on Repository {
-                nameWithOwner
-                stargazerCount
-                description
-                url
-                updatedAt
-                createdAt
-                pushedAt
-                licenseInfo {
-                  spdxId
-                  name
-                }
-                languages(first: 5) {
-                  totalSize
-                  edges {
-                    node {
-                      name
-                    }
-                    size
-                  }
-                }
-                repositoryTopics(first: 10) {
-                  nodes {
-                    topic {
-                      name
-                    }
-                  }
-                }
-              }
-            }
-            pageInfo {
-              hasNextPage
-              endCursor
-            }
-            repositoryCount
-          }
-          rateLimit {
-            remaining
-            cost
-          }
-        }
-        """
-        
-        # Build enhanced search query
-        search_query = f"language:Python stars:{min_stars}..{max_stars} archived:false fork:false"
-        if topic:
-            search_query += f" topic:{topic}"
-        if sort != "stars":
-            search_query += f" sort:{sort}"
-        
-        variables = {
-            "searchQuery": search_query,
-            "first": limit,
-            "after": after_cursor
-        }
-        
-        response = requests.post(
-            "https://api.github.com/graphql",
-            json={"query": query, "variables": variables},
-            headers=self.headers,
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"GraphQL request failed: {response.status_code}")
-        
-        data = response.json()
-        
-        if "errors" in data:
-            raise Exception(f"GraphQL errors: {data['errors']}")
-        
-        return {
-            'repositories': data["data"]["search"]["nodes"],
-            'rate_limit': data["data"]["rateLimit"],
-            'page_info': data["data"]["search"]["pageInfo"],
-            'repository_count': data["data"]["search"]["repositoryCount"],
-            'search_query_used': search_query,
-            'sort_used': sort
-        }
-    
     def get_diverse_repositories(self, min_stars=500, max_stars=5000, total_limit=50, max_attempts=5) -> List[Dict]:
         """Get a diverse set of repositories using multiple search strategies"""
-        all_repos = []
-        seen_repos = set()
+        per_attempt_limit = min(20, total_limit)
         
-        for attempt in range(max_attempts):
+        def run_attempt(attempt: int) -> List[Dict]:
             try:
                 # Use different strategies
-                result = self.search_with_randomization(
-                    min_stars, max_stars, 
-                    min(20, total_limit - len(all_repos)), 
-                    attempt
-                )
-                
-                # Add new repositories
-                for repo in result['repositories']:
-                    if repo['nameWithOwner'] not in seen_repos:
-                        seen_repos.add(repo['nameWithOwner'])
-                        all_repos.append(repo)
-                
-                # Stop if we have enough
-                if len(all_repos) >= total_limit:
-                    break
-                    
-                # Small delay to be respectful to API
-                time.sleep(0.5)
-                
+                return self.search_with_randomization(min_stars, max_stars, per_attempt_limit, attempt)['repositories']
             except Exception as e:
                 print(f"Warning: Search attempt {attempt} failed: {e}")
-                continue
+                return []
+        
+        # Strategies are independent queries, so issue them concurrently instead of one RTT after another
+        with ThreadPoolExecutor(max_workers=max(1, min(max_attempts, MAX_CONCURRENT_REQUESTS))) as executor:
+            results = list(executor.map(run_attempt, range(max_attempts)))
+        
+        # Merge in attempt order so the result is the same as a sequential run; stopping at
+        # total_limit keeps the seen set no larger than the result itself
+        all_repos = []
+        seen_repos = set()
+        for repo in chain.from_iterable(results):
+            if len(all_repos) >= total_limit:
+                break
+            if repo['nameWithOwner'] not in seen_repos:
+                seen_repos.add(repo['nameWithOwner'])
+                all_repos.append(repo)
         
-        return all_repos[:total_limit]
+        return all_repos
     
     def _get_cursor_for_attempt(self, attempt: int) -> Optional[str]:
         """Generate different cursors for pagination (simplified approach)"""
@@ -276,15 +437,12 @@ class GitHubClient:
         
         python_heavy_repos = []
         for repo in candidates['repositories']:
-            languages = repo.get('languages', {}).get('edges', [])
-            total_size = repo.get('languages', {}).get('totalSize', 0)
+            language_stats = repo.get('languages', {})
+            total_size = language_stats.get('totalSize', 0)
             
             if total_size > 0:
-                python_size = 0
-                for lang in languages:
-                    if lang['node']['name'] == 'Python':
-                        python_size = lang['size']
-                        break
+                sizes = {lang['node']['name']: lang['size'] for lang in language_stats.get('edges', [])}
+                python_size = sizes.get('Python', 0)
                 
                 python_percentage = (python_size / total_size) * 100
                 if python_percentage >= min_python_percentage:
@@ -299,24 +457,10 @@ class GitHubClient:
     
     def check_rate_limit(self) -> Dict:
         """Check current rate limit status"""
-        query = """
-        query {
-          rateLimit {
-            remaining
-            resetAt
-            cost
-          }
-        }
-        """
-        
-        response = requests.post(
-            "https://api.github.com/graphql",
-            json={"query": query},
-            headers=self.headers
-        )
+        response = self._request("POST", self.graphql_url, json={"query": _RATE_LIMIT_QUERY})
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             return data["data"]["rateLimit"]
         else:
             return {"remaining": 0, "resetAt": "", "cost": 0}
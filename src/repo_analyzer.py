@@ -1,25 +1,180 @@
-from typing import List, Dict, Tuple
-import requests
-from datetime import datetime, timedelta
-from .config import ALLOWED_LICENSES, GITHUB_TOKEN
+import re
+from typing import List, Dict, Tuple, Optional
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from .config import ALLOWED_LICENSES, MAX_CONCURRENT_REQUESTS
+from .github_client import GitHubClient, GraphQLError, DETAILS_CACHE_TTL_SECONDS
+
+# Everything the deep analysis needs, fetched in one round trip instead of ~6 REST calls
+_REPO_ANALYSIS_FIELDS = """
+fragment AnalysisFields on Repository {
+  stargazerCount
+  description
+  url
+  diskUsage
+  licenseInfo {
+    name
+  }
+  primaryLanguage {
+    name
+  }
+  defaultBranchRef {
+    target {
+      ... on Commit {
+        history(first: 1) {
+          nodes {
+            author {
+              date
+            }
+          }
+        }
+      }
+    }
+  }
+  openIssues: issues(states: OPEN) {
+    totalCount
+  }
+  openPullRequests: pullRequests(states: OPEN) {
+    totalCount
+  }
+  goodFirstIssues: issues(states: OPEN, labels: ["good first issue"], first: 3, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes {
+      title
+      url
+    }
+  }
+  helpWanted: issues(states: OPEN, labels: ["help wanted"], first: 2, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes {
+      title
+      url
+    }
+  }
+  bugs: issues(states: OPEN, labels: ["bug"], first: 2, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes {
+      title
+      url
+    }
+  }
+  rootTree: object(expression: "HEAD:") {
+    ... on Tree {
+      entries {
+        name
+        type
+      }
+    }
+  }
+}
+"""
+
+_REPO_ANALYSIS_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    ...AnalysisFields
+  }
+}
+""" + _REPO_ANALYSIS_FIELDS
+
+@lru_cache(maxsize=32)
+def _batch_analysis_query(size: int) -> str:
+    """Aliased query analyzing `size` repositories (r0..rN) in a single request"""
+    params = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(size))
+    fields = "\n".join(f"  r{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...AnalysisFields }}" for i in range(size))
+    return f"query({params}) {{\n{fields}\n}}\n" + _REPO_ANALYSIS_FIELDS
+
+# Component scores and their weight in the overall suitability score
+_SCORE_WEIGHTS = (
+    ('activity_score', 0.3),          # 30% - How active is the project
+    ('opportunity_score', 0.35),      # 35% - Are there contribution opportunities
+    ('complexity_score', 0.2),        # 20% - Is it manageable to work with
+    ('maintainability_score', 0.15),  # 15% - Is it well maintained
+)
+
+def _parse_github_timestamp(value: str) -> datetime:
+    """Parse GitHub timestamps as aware datetimes
+    
+    DateTime fields are fixed 'YYYY-MM-DDTHH:MM:SSZ' UTC strings; git dates (GitTimestamp)
+    keep the author's '+HH:MM' offset instead.
+    """
+    if value.endswith('Z'):
+        return datetime.fromisoformat(value[:19]).replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value)
+
+def _unexpected_errors(errors: List[Dict], alias: Optional[str] = None) -> List[Dict]:
+    """GraphQL errors other than NOT_FOUND, limited to `alias` (plus path-less, query-wide ones)"""
+    return [
+        error for error in errors
+        if error.get('type') != 'NOT_FOUND' and (alias is None or (error.get('path') or [alias])[0] == alias)
+    ]
 
 class RepositoryAnalyzer:
-    def __init__(self):
+    def __init__(self, client: Optional[GitHubClient] = None):
         self.allowed_licenses = ALLOWED_LICENSES
-        self.headers = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
-        self.base_url = "https://api.github.com"
+        # Same substring semantics as checking each allowed license in turn, in one C-level scan
+        self._license_re = re.compile("|".join(map(re.escape, self.allowed_licenses)))
+        self.client = client or GitHubClient()
 
     def analyze_repositories_fast(self, repos: List[Dict]) -> List[Dict]:
         """Quick analysis without additional API calls"""
+        analyze = self._analyze_single_repo
+        return [analyze(repo) for repo in repos]
+
+    def analyze_repository_deep(self, owner: str, repo: str, raise_errors: bool = False) -> Dict:
+        """Deep analysis with suitability scoring for SWE Challenge V3
+        
+        Fetch failures become an "Analysis failed" warning unless raise_errors is set, in which
+        case they propagate (GraphQLError for rate limits, auth and other GraphQL errors).
+        """
+        try:
+            repo_data = self._get_repo_details(owner, repo)
+        except Exception as e:
+            if raise_errors:
+                raise
+            return self._failed_analysis(owner, repo, e)
+        return self._analyze_repo_data(owner, repo, repo_data, datetime.now(timezone.utc))
+
+    def analyze_repositories_batch(self, repos: List[Tuple[str, str]], batch_size: int = 25) -> List[Dict]:
+        """Deep-analyze (owner, repo) pairs, fetching each batch with one aliased GraphQL query"""
+        batches = [repos[start:start + batch_size] for start in range(0, len(repos), batch_size)]
+        if len(batches) <= 1:
+            return [analysis for batch in batches for analysis in self._analyze_batch(batch)]
+        
+        # Batches are independent requests; the client's concurrency controller paces them
+        with ThreadPoolExecutor(max_workers=min(len(batches), MAX_CONCURRENT_REQUESTS)) as executor:
+            return [analysis for results in executor.map(self._analyze_batch, batches) for analysis in results]
+
+    def _analyze_batch(self, batch: List[Tuple[str, str]]) -> List[Dict]:
+        """Fetch and score one batch of repositories with a single aliased query"""
+        variables = {}
+        for i, (owner, repo) in enumerate(batch):
+            variables[f"owner{i}"] = owner
+            variables[f"name{i}"] = repo
+        
+        try:
+            payload = self.client.graphql(
+                _batch_analysis_query(len(batch)), variables, cache_ttl=DETAILS_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            return [self._failed_analysis(owner, repo, e) for owner, repo in batch]
+        
+        # Deleted or renamed repositories come back as null aliases (NOT_FOUND) and get the
+        # "not found" result; any other error on an alias (or the whole query) fails it instead
+        data = payload.get('data') or {}
+        errors = payload.get('errors') or []
+        now = datetime.now(timezone.utc)
         results = []
-        for repo in repos:
-            analysis = self._analyze_single_repo(repo)
-            results.append(analysis)
+        for i, (owner, repo) in enumerate(batch):
+            repo_data = data.get(f"r{i}")
+            alias_errors = _unexpected_errors(errors, f"r{i}") if repo_data is None else []
+            if alias_errors:
+                results.append(self._failed_analysis(owner, repo, GraphQLError(alias_errors)))
+            else:
+                results.append(self._analyze_repo_data(owner, repo, repo_data, now))
         return results
 
-    def analyze_repository_deep(self, owner: str, repo: str) -> Dict:
-        """Deep analysis with suitability scoring for SWE Challenge V3"""
-        analysis = {
+    def _empty_analysis(self, owner: str, repo: str) -> Dict:
+        """Analysis result before any scoring"""
+        return {
             'repo_name': f"{owner}/{repo}",
             'overall_score': 0,
             'is_suitable': False,
@@ -33,25 +188,33 @@ class RepositoryAnalyzer:
             'recommendation': ''
         }
 
+    def _failed_analysis(self, owner: str, repo: str, error: Exception) -> Dict:
+        """Analysis result for a repository whose data couldn't be fetched"""
+        analysis = self._empty_analysis(owner, repo)
+        analysis['warnings'].append(f"Analysis failed: {str(error)}")
+        return analysis
+
+    def _analyze_repo_data(self, owner: str, repo: str, repo_data: Optional[Dict], now: datetime) -> Dict:
+        """Score a repository from its fetched GraphQL data, with `now` as the activity reference time"""
+        analysis = self._empty_analysis(owner, repo)
+
         try:
-            # Get repository details
-            repo_data = self._get_repo_details(owner, repo)
             if not repo_data:
                 analysis['warnings'].append("Could not fetch repository data")
                 return analysis
 
             # Store basic repo info
-            analysis['stars'] = repo_data.get('stargazers_count', 0)
-            analysis['license'] = repo_data.get('license', {}).get('name', 'Unknown')
-            analysis['description'] = repo_data.get('description', '')
+            analysis['stars'] = repo_data.get('stargazerCount', 0)
+            analysis['license'] = (repo_data.get('licenseInfo') or {}).get('name', 'Unknown')
+            analysis['description'] = repo_data.get('description') or ''
 
             # Enhanced suitability analysis
-            activity = self._check_repository_activity(owner, repo, repo_data)
+            activity = self._check_repository_activity(repo_data, now)
             analysis['activity_score'] = activity['score']
             analysis['reasons'].extend(activity['reasons'])
             analysis['warnings'].extend(activity.get('warnings', []))
 
-            opportunities = self._find_contribution_opportunities(owner, repo)
+            opportunities = self._find_contribution_opportunities(repo_data)
             analysis['opportunity_score'] = opportunities['score']
             analysis['opportunities'] = opportunities['items']
 
@@ -61,7 +224,7 @@ class RepositoryAnalyzer:
             if complexity.get('warnings'):
                 analysis['warnings'].extend(complexity['warnings'])
 
-            maintainability = self._check_maintainability(owner, repo)
+            maintainability = self._check_maintainability(repo_data)
             analysis['maintainability_score'] = maintainability['score']
             analysis['reasons'].extend(maintainability['reasons'])
 
@@ -87,11 +250,13 @@ class RepositoryAnalyzer:
             spdx_id = license_info.get('spdxId', '')
             name = license_info.get('name', '')
             license_name = spdx_id or name
-            license_ok = any(allowed in license_name for allowed in self.allowed_licenses)
+            license_ok = bool(self._license_re.search(license_name))
 
         # Estimate Python files from language data
-        languages = repo.get('languages', {}).get('edges', [])
-        python_percentage = self._calculate_python_percentage(languages, repo)
+        language_stats = repo.get('languages', {})
+        python_percentage = self._calculate_python_percentage(
+            language_stats.get('edges', []), language_stats.get('totalSize', 0)
+        )
         estimated_py_files = max(1, int(python_percentage * 30))
 
         return {
@@ -103,10 +268,11 @@ class RepositoryAnalyzer:
             'python_percentage': f"{python_percentage*100:.1f}%",
             'url': repo['url'],
             'description': repo.get('description', '')[:100] + "..." if repo.get('description', '') else "",
-            'passes_criteria': self._passes_criteria(stars, license_ok, python_percentage)
+            'passes_criteria': self._passes_criteria(stars, license_ok, python_percentage),
+            'is_new': True  # Fresh from GitHub; callers filter out previously shown repos
         }
 
-    def _check_repository_activity(self, owner: str, repo: str, repo_data: Dict) -> Dict:
+    def _check_repository_activity(self, repo_data: Dict, now: datetime) -> Dict:
         """Check repository activity and maintenance level"""
         score = 0
         reasons = []
@@ -114,108 +280,83 @@ class RepositoryAnalyzer:
 
         try:
             # Check recent commits
-            commits_url = f"{self.base_url}/repos/{owner}/{repo}/commits"
-            response = requests.get(commits_url, headers=self.headers, params={'per_page': 5})
-            
-            if response.status_code == 200:
-                commits = response.json()
-                if commits:
-                    recent_commit = datetime.fromisoformat(commits[0]['commit']['author']['date'].replace('Z', '+00:00'))
-                    days_since = (datetime.now(recent_commit.tzinfo) - recent_commit).days
-                    
-                    if days_since <= 7:
-                        score += 5
-                        reasons.append(f"✅ Recently active (last commit {days_since} days ago)")
-                    elif days_since <= 30:
-                        score += 4
-                        reasons.append(f"✅ Recently active (last commit {days_since} days ago)")
-                    elif days_since <= 90:
-                        score += 3
-                        reasons.append(f"⚠️ Moderately active (last commit {days_since} days ago)")
-                    elif days_since <= 180:
-                        score += 2
-                        reasons.append(f"⚠️ Less active (last commit {days_since} days ago)")
-                    else:
-                        score += 1
-                        warnings.append(f"❌ Low activity (last commit {days_since} days ago)")
+            target = (repo_data.get('defaultBranchRef') or {}).get('target') or {}
+            commits = (target.get('history') or {}).get('nodes', [])
+            if commits:
+                recent_commit = _parse_github_timestamp(commits[0]['author']['date'])
+                days_since = (now - recent_commit).days
+                
+                if days_since <= 7:
+                    score += 5
+                    reasons.append(f"✅ Recently active (last commit {days_since} days ago)")
+                elif days_since <= 30:
+                    score += 4
+                    reasons.append(f"✅ Recently active (last commit {days_since} days ago)")
+                elif days_since <= 90:
+                    score += 3
+                    reasons.append(f"⚠️ Moderately active (last commit {days_since} days ago)")
+                elif days_since <= 180:
+                    score += 2
+                    reasons.append(f"⚠️ Less active (last commit {days_since} days ago)")
+                else:
+                    score += 1
+                    warnings.append(f"❌ Low activity (last commit {days_since} days ago)")
             
-            # Check issue activity
-            issues_url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-            response = requests.get(issues_url, headers=self.headers, params={'state': 'open', 'per_page': 1})
-            if response.status_code == 200:
-                if response.headers.get('link'):  # Has pagination = many issues
-                    reasons.append("📋 Active issue discussions")
-                    score += 0.5  # Bonus for active discussions
+            # Check issue activity (open pull requests count too, as in GitHub's /issues listing)
+            open_items = (
+                (repo_data.get('openIssues') or {}).get('totalCount', 0) +
+                (repo_data.get('openPullRequests') or {}).get('totalCount', 0)
+            )
+            if open_items > 1:  # Several open issues or pull requests
+                reasons.append("📋 Active issue discussions")
+                score += 0.5  # Bonus for active discussions
 
         except Exception as e:
             warnings.append(f"⚠️ Could not check activity: {str(e)}")
 
         return {'score': min(score, 5), 'reasons': reasons, 'warnings': warnings}
 
-    def _find_contribution_opportunities(self, owner: str, repo: str) -> Dict:
+    def _find_contribution_opportunities(self, repo_data: Dict) -> Dict:
         """Find specific contribution opportunities"""
         score = 0
         opportunities = []
 
         try:
-            issues_url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-
-            # Search for good first issues
-            response = requests.get(issues_url, headers=self.headers, params={
-                'labels': 'good first issue',
-                'state': 'open',
-                'per_page': 5
-            })
-            
-            if response.status_code == 200:
-                good_first_issues = response.json()
-                if isinstance(good_first_issues, list) and good_first_issues:
-                    for issue in good_first_issues[:3]:  # Limit to 3
-                        opportunities.append({
-                            'type': '🟢 Good First Issue',
-                            'title': issue['title'][:60] + "..." if len(issue['title']) > 60 else issue['title'],
-                            'url': issue['html_url']
-                        })
-                    score += min(len(good_first_issues), 3) * 1.0  # 1 point per good first issue
-
-            # Search for help wanted issues 
-            response = requests.get(issues_url, headers=self.headers, params={
-                'labels': 'help wanted',
-                'state': 'open',
-                'per_page': 5
-            })
-            
-            if response.status_code == 200:
-                help_wanted = response.json()
-                if isinstance(help_wanted, list) and help_wanted:
-                    for issue in help_wanted[:2]:  # Limit to 2
-                        opportunities.append({
-                            'type': '🆘 Help Wanted',
-                            'title': issue['title'][:60] + "..." if len(issue['title']) > 60 else issue['title'],
-                            'url': issue['html_url']
-                        })
-                    score += min(len(help_wanted), 2) * 0.8  # 0.8 points per help wanted
-
-            # Search for bugs
-            response = requests.get(issues_url, headers=self.headers, params={
-                'labels': 'bug',
-                'state': 'open',
-                'per_page': 5
-            })
-            
-            if response.status_code == 200:
-                bugs = response.json()
-                if isinstance(bugs, list) and bugs:
-                    for bug in bugs[:2]:  # Limit to 2
-                        opportunities.append({
-                            'type': '🐛 Bug Fix',
-                            'title': bug['title'][:60] + "..." if len(bug['title']) > 60 else bug['title'],
-                            'url': bug['html_url']
-                        })
-                    score += min(len(bugs), 2) * 0.6  # 0.6 points per bug
+            # Good first issues
+            good_first_issues = (repo_data.get('goodFirstIssues') or {}).get('nodes', [])
+            if good_first_issues:
+                for issue in good_first_issues[:3]:  # Limit to 3
+                    opportunities.append({
+                        'type': '🟢 Good First Issue',
+                        'title': issue['title'][:60] + "..." if len(issue['title']) > 60 else issue['title'],
+                        'url': issue['url']
+                    })
+                score += min(len(good_first_issues), 3) * 1.0  # 1 point per good first issue
+
+            # Help wanted issues 
+            help_wanted = (repo_data.get('helpWanted') or {}).get('nodes', [])
+            if help_wanted:
+                for issue in help_wanted[:2]:  # Limit to 2
+                    opportunities.append({
+                        'type': '🆘 Help Wanted',
+                        'title': issue['title'][:60] + "..." if len(issue['title']) > 60 else issue['title'],
+                        'url': issue['url']
+                    })
+                score += min(len(help_wanted), 2) * 0.8  # 0.8 points per help wanted
+
+            # Bugs
+            bugs = (repo_data.get('bugs') or {}).get('nodes', [])
+            if bugs:
+                for bug in bugs[:2]:  # Limit to 2
+                    opportunities.append({
+                        'type': '🐛 Bug Fix',
+                        'title': bug['title'][:60] + "..." if len(bug['title']) > 60 else bug['title'],
+                        'url': bug['url']
+                    })
+                score += min(len(bugs), 2) * 0.6  # 0.6 points per bug
 
         except Exception as e:
-            pass  # Silently handle API errors
+            pass  # Tolerate partial GraphQL data
 
         return {'score': min(score, 5), 'items': opportunities[:5]}  # Max 5 opportunities
 
@@ -226,7 +367,7 @@ class RepositoryAnalyzer:
         warnings = []
 
         # Size check (more nuanced scoring)
-        size_kb = repo_data.get('size', 0)
+        size_kb = repo_data.get('diskUsage') or 0
         size_mb = size_kb / 1024
 
         if size_mb > 200:  # 200MB+
@@ -243,13 +384,13 @@ class RepositoryAnalyzer:
             reasons.append(f"✅ Manageable size ({size_mb:.0f} MB)")
 
         # Language complexity
-        if repo_data.get('language') == 'Python':
+        if (repo_data.get('primaryLanguage') or {}).get('name') == 'Python':
             reasons.append("✅ Python-primary repository")
         else:
             score = max(1, score - 1)  # Reduce score if not Python primary
 
         # Documentation check
-        description = repo_data.get('description', '')
+        description = repo_data.get('description') or ''
         if len(description) > 50:
             reasons.append("✅ Well documented")
         else:
@@ -261,31 +402,41 @@ class RepositoryAnalyzer:
             'warnings': warnings
         }
 
-    def _check_maintainability(self, owner: str, repo: str) -> Dict:
+    def _check_maintainability(self, repo_data: Dict) -> Dict:
         """Check maintainability indicators"""
         score = 0
         reasons = []
 
         try:
             # Check if repo has contributing guidelines
-            contents_url = f"{self.base_url}/repos/{owner}/{repo}/contents"
-            response = requests.get(contents_url, headers=self.headers)
+            entries = (repo_data.get('rootTree') or {}).get('entries', [])
             
-            if response.status_code == 200:
-                contents = response.json()
-                files = [item['name'].lower() for item in contents if item['type'] == 'file']
-                
-                if any('contributing' in f for f in files):
-                    score += 2
-                    reasons.append("✅ Has contributing guidelines")
-                
-                if 'readme.md' in files or 'readme.rst' in files:
-                    score += 1.5
-                    reasons.append("✅ Has README")
-                
-                if any('license' in f for f in files):
-                    score += 1.5
-                    reasons.append("✅ Has license file")
+            # Classify the root files in one pass, stopping once every indicator is found
+            has_contributing = has_readme = has_license = False
+            for item in entries:
+                if item['type'] != 'blob':
+                    continue
+                f = item['name'].lower()
+                if not has_contributing and 'contributing' in f:
+                    has_contributing = True
+                if not has_readme and f in ('readme.md', 'readme.rst'):
+                    has_readme = True
+                if not has_license and 'license' in f:
+                    has_license = True
+                if has_contributing and has_readme and has_license:
+                    break
+            
+            if has_contributing:
+                score += 2
+                reasons.append("✅ Has contributing guidelines")
+            
+            if has_readme:
+                score += 1.5
+                reasons.append("✅ Has README")
+            
+            if has_license:
+                score += 1.5
+                reasons.append("✅ Has license file")
 
         except Exception:
             pass
@@ -294,13 +445,7 @@ class RepositoryAnalyzer:
 
     def _calculate_suitability_score(self, analysis: Dict) -> float:
         """Calculate weighted suitability score (0-5 scale)"""
-        weighted_score = (
-            analysis['activity_score'] * 0.3 +      # 30% - How active is the project
-            analysis['opportunity_score'] * 0.35 +   # 35% - Are there contribution opportunities  
-            analysis['complexity_score'] * 0.2 +     # 20% - Is it manageable to work with
-            analysis['maintainability_score'] * 0.15 # 15% - Is it well maintained
-        )
-        return round(weighted_score, 1)
+        return round(sum(analysis[field] * weight for field, weight in _SCORE_WEIGHTS), 1)
 
     def _generate_recommendation(self, analysis: Dict) -> str:
         """Generate actionable recommendation (FIXED THRESHOLDS for 0-5 scale)"""
@@ -316,20 +461,13 @@ class RepositoryAnalyzer:
             return "❌ NOT RECOMMENDED. Consider looking for more active repositories with clearer opportunities."
 
     # Existing helper methods (keep unchanged)
-    def _calculate_python_percentage(self, languages: List, repo: Dict) -> float:
+    def _calculate_python_percentage(self, languages: List, total_size: int) -> float:
         """Calculate percentage of Python code in repository"""
-        python_percentage = 0
-        total_size = repo.get('languages', {}).get('totalSize', 0)
-        
-        if total_size == 0:
+        if not total_size:
             return 0
-
-        for lang in languages:
-            if lang['node']['name'] == 'Python':
-                python_percentage = lang['size'] / total_size
-                break
-
-        return python_percentage
+        
+        sizes = {lang['node']['name']: lang['size'] for lang in languages}
+        return sizes.get('Python', 0) / total_size
 
     def _passes_criteria(self, stars: int, license_ok: bool, python_percentage: float) -> bool:
         """Check if repository passes all criteria"""
@@ -343,18 +481,25 @@ class RepositoryAnalyzer:
         """Filter for repositories that meet all criteria"""
         return [r for r in results if r['passes_criteria']]
 
-    def _get_repo_details(self, owner: str, repo: str) -> Dict:
-        """Get detailed repository information"""
-        url = f"{self.base_url}/repos/{owner}/{repo}"
-        response = requests.get(url, headers=self.headers)
-        return response.json() if response.status_code == 200 else None
+    def _get_repo_details(self, owner: str, repo: str) -> Optional[Dict]:
+        """Get detailed repository information, or None if the repository doesn't exist
+        
+        A missing repository caused by anything but NOT_FOUND (rate limits, auth, ...) raises GraphQLError.
+        """
+        payload = self.client.graphql(_REPO_ANALYSIS_QUERY, {"owner": owner, "name": repo}, cache_ttl=DETAILS_CACHE_TTL_SECONDS)
+        repository = (payload.get('data') or {}).get('repository')
+        if repository is None:
+            errors = _unexpected_errors(payload.get('errors') or [])
+            if errors:
+                raise GraphQLError(errors)
+        return repository
 
     def _analyze_repo_from_data(self, repo_data: Dict) -> Dict:
         """Analyze repository from API data"""
         return {
-            'stars': repo_data.get('stargazers_count', 0),
-            'license': repo_data.get('license', {}).get('name', 'Unknown'),
-            'url': repo_data.get('html_url', ''),
-            'description': repo_data.get('description', ''),
-            'language': repo_data.get('language', 'Unknown')
+            'stars': repo_data.get('stargazerCount', 0),
+            'license': (repo_data.get('licenseInfo') or {}).get('name', 'Unknown'),
+            'url': repo_data.get('url', ''),
+            'description': repo_data.get('description') or '',
+            'language': (repo_data.get('primaryLanguage') or {}).get('name', 'Unknown')
         }